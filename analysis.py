@@ -0,0 +1,52 @@
+import re
+from functools import cached_property
+
+from resources import sent_tokenize
+
+import sentiment as sentiment_engine
+import metrics
+
+TOPIC_WORD_PATTERN = re.compile(r'\b[A-Za-z][a-z]{2,}\b')
+ENTITY_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+
+class AnalysisDocument:
+    """Article text tokenized once and shared by every analyzer
+    
+    Each view (sentences, word counts, sentiment tokens, topic words,
+    entities) is computed on first use and cached on the document.
+    """
+
+    def __init__(self, text):
+        self.text = text
+
+    @classmethod
+    def of(cls, text_or_document):
+        """Wrap a string in a document; documents are returned as is"""
+        if isinstance(text_or_document, cls):
+            return text_or_document
+        return cls(text_or_document)
+
+    @cached_property
+    def sentences(self):
+        with metrics.span("sent_tokenize"):
+            return sent_tokenize(self.text)
+
+    @cached_property
+    def sentence_word_counts(self):
+        return [len(sentence.split()) for sentence in self.sentences]
+
+    @cached_property
+    def word_count(self):
+        return len(self.text.split())
+
+    @cached_property
+    def sentiment_tokens(self):
+        return sentiment_engine.get_lexicon().tokenize(self.text)
+
+    @cached_property
+    def topic_words(self):
+        return TOPIC_WORD_PATTERN.findall(self.text)
+
+    @cached_property
+    def entities(self):
+        return ENTITY_PATTERN.findall(self.text)
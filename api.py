@@ -1,25 +1,24 @@
-import requests
-from bs4 import BeautifulSoup
 import re
-from textblob import TextBlob
-import nltk
-from nltk.tokenize import sent_tokenize
-from nltk.corpus import stopwords
 from collections import Counter
-import io
-from gtts import gTTS
 import random
 import time
 import logging
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
-
-# Download necessary NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
+import http_client
+import parsing
+import tts
+import translation
+import metrics
+import sentiment as sentiment_engine
+from analysis import AnalysisDocument
+import topics as topic_engine
+import comparative
+import syndication
+from cache import get_article_cache, get_page_cache, stats as cache_stats
+from utils import normalize_url, resolve_link
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -51,199 +50,539 @@ def format_date(date_str):
         logger.error(f"Error formatting date {date_str}: {e}")
         return date_str
 
-def fetch_news(company_name, num_articles=10):
-    """Fetch and extract news articles related to the company"""
-    articles = []
-    sources = [
-        f"https://www.google.com/search?q={company_name}+news&tbm=nws",
-        f"https://economictimes.indiatimes.com/search?q={company_name}",
-        f"https://www.business-standard.com/search?q={company_name}",
-    ]
+# Search sources: result page URL template, result item selector, the
+# base URL prepended to relative article links and a quality rank; links
+# from higher quality sources are fetched first. Point these at a local
+# server to exercise the fetch engine offline.
+SEARCH_SOURCES = [
+    {
+        'name': 'google',
+        'url': "https://www.google.com/search?q={query}+news&tbm=nws",
+        'selector': 'div.SoaBEf',
+        'base_url': "",
+        'quality': 1,  # Aggregator: links to any publisher, wrapped in /url?q= redirects
+    },
+    {
+        'name': 'economictimes',
+        'url': "https://economictimes.indiatimes.com/search?q={query}",
+        'selector': 'div.eachStory',
+        'base_url': "https://economictimes.indiatimes.com",
+        'quality': 2,
+    },
+    {
+        'name': 'business-standard',
+        'url': "https://www.business-standard.com/search?q={query}",
+        'selector': 'div.listing-main',
+        'base_url': "https://www.business-standard.com",
+        'quality': 2,
+    },
+]
+
+# Example article URLs fetched directly for some companies, after the search results
+EXAMPLE_URLS = {
+    "tesla": [
+        "https://economictimes.indiatimes.com/industry/renewables/tata-group-partners-with-tesla-a-new-era-for-indian-electric-vehicle-supply-chains/articleshow/119270573.cms"
+    ],
+    "samsung": [
+        "https://www.business-standard.com/about/what-is-samsung"
+    ],
+}
+
+# Fetch engine settings
+FETCH_MODES = ("sequential", "thread", "async")
+MAX_CONCURRENCY = 8     # Global cap on in-flight requests
+
+def fetch_search_links(source, company_name, use_cache=True):
+    """Fetch one search result page and return the article links it lists
     
-    headers = {
-        'User -Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+    Cached result pages are reused while fresh and revalidated with their
+    ETag / Last-Modified validators once stale. A stale copy is also served
+    when the request fails or returns an error status.
+    """
+    url = source['url'].format(query=company_name)
+    page_cache = get_page_cache() if use_cache else None
+    entry = page_cache.lookup(url) if page_cache is not None else None
+    if entry is not None and page_cache.is_fresh(entry):
+        cache_stats.record(url, 'hits')
+        return entry['links']
     
-    # Add example URLs for testing
-    if company_name.lower() == "tesla":
-        example_urls = [
-            "https://economictimes.indiatimes.com/industry/renewables/tata-group-partners-with-tesla-a-new-era-for-indian-electric-vehicle-supply-chains/articleshow/119270573.cms"
-        ]
-        sources.extend(example_urls)
-    elif company_name.lower() == "samsung":
-        example_urls = [
-            "https://www.business-standard.com/about/what-is-samsung"
-        ]
-        sources.extend(example_urls)
-    
-    # Process each source
-    for source in sources:
-        try:
-            time.sleep(1)  # Avoid overwhelming servers
-            response = requests.get(source, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            if "google.com" in source:
-                for item in soup.select('div.SoaBEf'):
-                    link_elem = item.find('a')
-                    if link_elem and link_elem.get('href'):
-                        article_url = link_elem['href']
-                        article_data = extract_article_data(article_url, company_name)
-                        if article_data:
-                            articles.append(article_data)
-                            if len(articles) >= num_articles:
-                                break
-            elif "economictimes" in source:
-                for item in soup.select('div.eachStory'):
-                    link_elem = item.find('a')
-                    if link_elem and link_elem.get('href'):
-                        article_url = "https://economictimes.indiatimes.com" + link_elem['href']
-                        article_data = extract_article_data(article_url, company_name)
-                        if article_data:
-                            articles.append(article_data)
-                            if len(articles) >= num_articles:
-                                break
-            elif "business-standard" in source:
-                for item in soup.select('div.listing-main'):
-                    link_elem = item.find('a')
-                    if link_elem and link_elem.get('href'):
-                        article_url = "https://www.business-standard.com" + link_elem['href']
-                        article_data = extract_article_data(article_url, company_name)
-                        if article_data:
-                            articles.append(article_data)
-                            if len(articles) >= num_articles:
-                                break
-            elif source.startswith("http"):
-                # Direct article URLs
-                article_data = extract_article_data(source, company_name)
-                if article_data:
-                    articles.append(article_data)
-        except Exception as e:
-            logger.error(f"Error processing source {source}: {e}")
-            continue
+    links = []
+    try:
+        with metrics.span("search_fetch"):
+            response = http_client.get(url, validators=entry['validators'] if entry else None)
+        if entry is not None and response.status_code == 304:
+            cache_stats.record(url, 'revalidated')
+            page_cache.put(url, entry['links'], http_client.validators_from(response, entry['validators']))
+            return entry['links']
+        if entry is not None and response.status_code != 200:
+            logger.warning(f"Search source {source['name']} returned {response.status_code}, using its cached links")
+            metrics.incr("stale_fallbacks")
+            return entry['links']
+        if page_cache is not None:
+            cache_stats.record(url, 'misses')
         
-        if len(articles) >= num_articles:
-            break
-                
-    # Generate mock data if needed
-    while len(articles) < num_articles:
-        articles.append(generate_mock_article(company_name, len(articles) + 1))
+        with metrics.span("search_parse"):
+            soup = parsing.make_soup(response.text)
+            for item in soup.select(source['selector']):
+                link_elem = item.find('a')
+                if link_elem and link_elem.get('href'):
+                    links.append(source['base_url'] + link_elem['href'])
+        
+        if page_cache is not None and response.status_code == 200:
+            page_cache.put(url, links, http_client.validators_from(response))
+    except Exception as e:
+        logger.error(f"Error processing source {source['name']}: {e}")
+        metrics.incr("search_errors")
+        if entry is not None:
+            metrics.incr("stale_fallbacks")
+            return entry['links']
+    return links
+
+def collect_candidate_links(company_name, mode="thread", max_workers=MAX_CONCURRENCY, use_cache=True):
+    """Collect article links from every search source, best sources first, each article once
     
-    return articles[:num_articles]
+    Search pages are fetched in parallel except in sequential mode. Links are
+    ordered by source quality, then source order, then search rank, so of
+    duplicate links the one from the best source is kept.
+    """
+    if mode == "sequential":
+        per_source = [fetch_search_links(source, company_name, use_cache) for source in SEARCH_SOURCES]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            per_source = list(executor.map(lambda source: fetch_search_links(source, company_name, use_cache), SEARCH_SOURCES))
+    
+    ranked = []
+    for order, (source, source_links) in enumerate(zip(SEARCH_SOURCES, per_source)):
+        ranked.extend((-source.get('quality', 0), order, rank, link) for rank, link in enumerate(source_links))
+    links = [link for *_, link in sorted(ranked)]
+    links.extend(EXAMPLE_URLS.get(company_name.lower(), []))
+    return dedupe_links(links)
+
+def dedupe_links(links):
+    """Resolve redirects and tracking parameters and keep the first link to each article
+    
+    Links are compared by their normalized form (see utils.normalize_url);
+    the number dropped is counted as article fetches saved.
+    """
+    seen = set()
+    unique = []
+    for link in links:
+        url = resolve_link(link)
+        key = normalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    metrics.incr("candidate_links", len(links))
+    metrics.incr("duplicate_links", len(links) - len(unique))
+    return unique
+
+class StoryTracker:
+    """Collapses syndicated copies of a story within one fetch onto its first copy
+    
+    Copies are recognised by the 'story' key extract_article_data sets (the
+    URL of the original); the sources of later copies are appended to the
+    first copy's 'syndicated_by' list instead of being counted as articles.
+    """
+
+    def __init__(self):
+        self._first = {}
+
+    def add(self, article):
+        """True if the article starts a new story, False if it was folded into an earlier copy"""
+        story = article.get('story') or normalize_url(article['url'])
+        first = self._first.get(story)
+        if first is None:
+            article['syndicated_by'] = []
+            self._first[story] = article
+            return True
+        if article['source'] != first['source'] and article['source'] not in first['syndicated_by']:
+            first['syndicated_by'].append(article['source'])
+        metrics.incr("syndicated_copies")
+        return False
 
-def extract_article_data(url, company_name):
-    """Extract data from a news article URL"""
+def _iter_articles_sequential(links, company_name, num_articles, use_cache):
+    """Extract articles one after another, yielding (link index, article) pairs"""
+    found = 0
+    stories = StoryTracker()
+    for index, url in enumerate(links):
+        article_data = extract_article_data(url, company_name, use_cache)
+        if article_data and stories.add(article_data):
+            yield index, article_data
+            found += 1
+            if found >= num_articles:
+                break
+
+class _Extractions:
+    """Article extractions of the concurrent fetch engines, in link order
+    
+    Keeps no more extractions in flight than articles still needed (capped
+    at max_workers), so an early stop wastes no fetches. submit(fn, *args)
+    starts one and returns its future.
+    """
+
+    def __init__(self, links, company_name, num_articles, max_workers, use_cache, submit):
+        self.queue = iter(enumerate(links))
+        self.company_name = company_name
+        self.num_articles = num_articles
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.submit = submit
+        self.pending = {}  # future -> link index
+        self.found = 0
+        self.stories = StoryTracker()
+
+    def running(self):
+        return bool(self.pending) and self.found < self.num_articles
+
+    def fill(self):
+        while len(self.pending) < min(self.max_workers, self.num_articles - self.found):
+            next_link = next(self.queue, None)
+            if next_link is None:
+                return
+            index, url = next_link
+            self.pending[self.submit(extract_article_data, url, self.company_name, self.use_cache)] = index
+
+    def collect(self, done):
+        """(link index, article) pairs of the finished extractions that count, then top up"""
+        pairs = []
+        for future in done:
+            index = self.pending.pop(future)
+            article_data = future.result()
+            if article_data and self.found < self.num_articles and self.stories.add(article_data):
+                self.found += 1
+                pairs.append((index, article_data))
+        self.fill()
+        return pairs
+
+    def cancel(self):
+        for future in self.pending:
+            future.cancel()
+
+def _iter_articles_threaded(links, company_name, num_articles, max_workers, use_cache):
+    """Extract articles on a thread pool, yielding (link index, article) pairs as they complete
+    
+    Stops once enough have succeeded.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    extractions = _Extractions(links, company_name, num_articles, max_workers, use_cache, executor.submit)
     try:
-        headers = {
-            'User -Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract title
-        title = soup.find('h1')
-        if title:
-            title = title.get_text().strip()
-        else:
-            title_candidates = [
-                soup.select_one('div.artTitle h1'), 
-                soup.select_one('div.headline'),
-                soup.select_one('.article-title'),
-                soup.select_one('.story-headline')
-            ]
-            for candidate in title_candidates:
-                if candidate:
-                    title = candidate.get_text().strip()
-                    break
-            if not title:
-                title = f"Article about {company_name}"
-        
-        # Extract article content
-        content = ""
-        article_elements = [
-            soup.select('div.artText p'),
-            soup.select('div.story-content p'),
-            soup.select('article p'),
-            soup.select('.article-content p')
-        ]
-        
-        for elements in article_elements:
-            if elements:
-                content = ' '.join([p.get_text().strip() for p in elements])
+        extractions.fill()
+        while extractions.running():
+            done, _ = wait(extractions.pending, return_when=FIRST_COMPLETED)
+            yield from extractions.collect(done)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+async def _iter_articles_async(links, company_name, num_articles, max_workers, use_cache):
+    """Extract articles from the event loop, yielding (link index, article) pairs as they complete
+    
+    Stops once enough have succeeded. Extractions run on a private executor,
+    so stopping neither waits for the ones in flight nor starts queued ones.
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    submit = lambda fn, *args: loop.run_in_executor(executor, fn, *args)
+    extractions = _Extractions(links, company_name, num_articles, max_workers, use_cache, submit)
+    try:
+        extractions.fill()
+        while extractions.running():
+            done, _ = await asyncio.wait(extractions.pending, return_when=asyncio.FIRST_COMPLETED)
+            for pair in extractions.collect(done):
+                yield pair
+    finally:
+        extractions.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _iter_from_async(pairs):
+    """Drive an async generator from synchronous code on a private event loop"""
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(pairs.__anext__())
+            except StopAsyncIteration:
                 break
+    finally:
+        loop.run_until_complete(pairs.aclose())
+        loop.close()
+
+def _check_mode(mode):
+    if mode not in FETCH_MODES:
+        raise ValueError(f"Unknown fetch mode {mode!r}, expected one of {FETCH_MODES}")
+
+def _mock_articles(company_name, count, num_articles):
+    """Mock articles numbered count+1 to num_articles, filling up a short result"""
+    metrics.incr("mock_articles", max(num_articles - count, 0))
+    for index in range(count + 1, num_articles + 1):
+        yield generate_mock_article(company_name, index)
+
+def _iter_news_pairs(company_name, num_articles, mode, max_workers, use_cache):
+    """(position, article) pairs in completion order, topped up with mock articles
+    
+    Positions follow search result order; mock articles come last.
+    """
+    _check_mode(mode)
+    
+    links = collect_candidate_links(company_name, mode, max_workers, use_cache)
+    
+    if mode == "sequential":
+        pairs = _iter_articles_sequential(links, company_name, num_articles, use_cache)
+    elif mode == "thread":
+        pairs = _iter_articles_threaded(links, company_name, num_articles, max_workers, use_cache)
+    else:
+        pairs = _iter_from_async(_iter_articles_async(links, company_name, num_articles, max_workers, use_cache))
+    
+    count = 0
+    try:
+        for pair in pairs:
+            yield pair
+            count += 1
+    finally:
+        pairs.close()
+    
+    # Generate mock data if needed
+    for offset, article_data in enumerate(_mock_articles(company_name, count, num_articles)):
+        yield len(links) + offset, article_data
+
+@metrics.timed("fetch_news")
+def fetch_news(company_name, num_articles=10, mode="thread", max_workers=MAX_CONCURRENCY, use_cache=True):
+    """Fetch and extract news articles related to the company
+    
+    mode selects the fetch engine: "sequential", "thread" (default) or "async".
+    max_workers caps the number of requests in flight across all hosts.
+    use_cache=False bypasses the search page and article caches.
+    Syndicated copies of a story count once, listed in its 'syndicated_by'.
+    """
+    pairs = _iter_news_pairs(company_name, num_articles, mode, max_workers, use_cache)
+    # Keep search result order regardless of completion order
+    return [article_data for _, article_data in sorted(pairs, key=lambda pair: pair[0])][:num_articles]
+
+def iter_news(company_name, num_articles=10, mode="thread", max_workers=MAX_CONCURRENCY, use_cache=True):
+    """Like fetch_news, but yield each article as soon as it has been extracted
+    
+    Articles arrive in completion order rather than search result order; mock
+    articles fill up to num_articles at the end.
+    """
+    for _, article_data in _iter_news_pairs(company_name, num_articles, mode, max_workers, use_cache):
+        yield article_data
+
+async def aiter_news(company_name, num_articles=10, max_workers=MAX_CONCURRENCY, use_cache=True):
+    """Async iterator variant of iter_news for callers already running an event loop"""
+    links = await asyncio.to_thread(collect_candidate_links, company_name, "async", max_workers, use_cache)
+    
+    count = 0
+    pairs = _iter_articles_async(links, company_name, num_articles, max_workers, use_cache)
+    try:
+        async for _, article_data in pairs:
+            yield article_data
+            count += 1
+    finally:
+        await pairs.aclose()
+    
+    # Generate mock data if needed
+    for article_data in _mock_articles(company_name, count, num_articles):
+        yield article_data
+
+def benchmark_fetch(company_name, num_articles=5, modes=FETCH_MODES, repeat=1):
+    """Seconds per fetch_news call in each fetch mode, with the caches bypassed
+    
+    Point SEARCH_SOURCES at a local server (see service.py --sources) for
+    repeatable numbers.
+    """
+    results = {}
+    for mode in modes:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fetch_news(company_name, num_articles, mode=mode, use_cache=False)
+        results[mode] = (time.perf_counter() - start) / repeat
+    return results
+
+def extract_article_data(url, company_name, use_cache=True):
+    """Extract data from a news article URL
+    
+    Previously analysed articles are served from the on-disk article cache
+    without any network or NLP work unless use_cache is False. Stale entries
+    are revalidated with a conditional request; a 304 reuses the cached
+    analysis without parsing the page again. A near-duplicate of an already
+    analysed story (a syndicated copy) reuses that story's analysis too, and
+    'story' names the URL of the original. A stale entry is also served when
+    the request fails or returns an error status.
+    """
+    article_cache = get_article_cache() if use_cache else None
+    entry = article_cache.lookup(url, company_name) if article_cache is not None else None
+    if entry is not None and article_cache.is_fresh(entry):
+        cache_stats.record(url, 'hits')
+        return _with_audio_key(entry['article'])
+    
+    try:
+        with metrics.span("article_fetch"):
+            response = http_client.get(url, validators=entry['validators'] if entry else None)
+        if entry is not None and response.status_code == 304:
+            cache_stats.record(url, 'revalidated')
+            article_cache.put(url, company_name, entry['article'],
+                              http_client.validators_from(response, entry['validators']))
+            return _with_audio_key(entry['article'])
+        if entry is not None and response.status_code != 200:
+            logger.warning(f"{url} returned {response.status_code}, using the cached article")
+            metrics.incr("stale_fallbacks")
+            return _with_audio_key(entry['article'])
+        if article_cache is not None:
+            cache_stats.record(url, 'misses')
         
-        if not content:
-            paragraphs = soup.find_all('p')
-            content = ' '.join([p.get_text().strip() for p in paragraphs if len(p.get_text().strip()) > 50])
-        
-        if not content:
+        page = parse_article_page(response.text, company_name, url=url)
+        if page is None:
             return None
-        
-        # Extract date
-        date = None
-        date_elements = [
-            soup.select_one('meta[property="article:published_time"]'),
-            soup.select_one('meta[name="publish-date"]'),
-            soup.select_one('.date'),
-            soup.select_one('.article-date'),
-            soup.select_one('time')
-        ]
-        
-        for element in date_elements:
-            if element:
-                if element.get('content'):
-                    date = element.get('content')
-                else:
-                    date = element.get_text().strip()
-                break
-        
-        if not date:
-            date = "Recent"
-        else:
-            date = format_date(date)
+        title, content, date = page['title'], page['content'], page['date']
         
         # Extract source
         source = url.split('//')[1].split('/')[0].replace('www.', '')
         
-        # Generate summary
-        summary = generate_summary(content, company_name)
-        
-        # Perform sentiment analysis
-        sentiment = analyze_sentiment(content)
-        
-        # Extract key topics
-        topics = extract_topics(content, company_name)
-        
-        # Calculate reading time
-        reading_time = calculate_reading_time(content)
-        
-        # Generate audio summary
-        audio_summary = text_to_speech_hindi(summary)
+        stored_content = clean_text(content[:2000])  # Limit content length
+        story, original = find_original(url, company_name, stored_content, article_cache)
+        if original is not None:
+            summary, sentiment = original['summary'], original['sentiment']
+            topics, reading_time = original['topics'], original['reading_time']
+        else:
+            # Tokenize once for all analyzers
+            doc = AnalysisDocument(content)
+            
+            # Generate summary
+            summary = generate_summary(doc, company_name)
+            
+            # Perform sentiment analysis
+            sentiment = analyze_sentiment(doc)
+            
+            # Extract key topics
+            topics = extract_topics(doc, company_name)
+            
+            # Calculate reading time
+            reading_time = calculate_reading_time(doc)
         
-        return {
+        article = {
             'title': clean_text(title),
             'summary': summary,
-            'content': clean_text(content[:2000]),  # Limit content length
+            'content': stored_content,
             'url': url,
             'date': date,
             'source': source,
+            'story': story,
             'sentiment': sentiment,
             'topics': topics,
             'reading_time': reading_time,
-            'audio_summary': audio_summary
         }
     except Exception as e:
         logger.error(f"Error extracting data from {url}: {e}")
+        metrics.incr("article_errors")
+        if entry is not None:
+            metrics.incr("stale_fallbacks")
+            return _with_audio_key(entry['article'])
+        return None
+    
+    if article_cache is not None and response.status_code == 200:
+        article_cache.put(url, company_name, article, http_client.validators_from(response))
+    
+    return _with_audio_key(article)
+
+def find_original(url, company_name, content, article_cache=None):
+    """Story URL of an article and, for a syndicated copy, the cached analysis of the original
+    
+    The article's content is looked up in the near-duplicate index (see
+    syndication.DuplicateIndex) and stored there if it is new. Returns
+    (story URL, original article dict or None).
+    """
+    key = normalize_url(url)
+    with metrics.span("near_duplicates"):
+        story = syndication.get_index().match(key, content)
+    if story is None:
+        return key, None
+    metrics.incr("syndicated_articles")
+    entry = article_cache.lookup(story, company_name) if article_cache is not None else None
+    if entry is None:
+        return story, None
+    metrics.incr("analysis_reused")
+    return story, entry['article']
+
+def _with_audio_key(article):
+    """Attach the key of the article's (not yet synthesized) Hindi audio summary"""
+    return {**article, 'audio_key': article_audio_key(article)}
+
+def article_audio_key(article):
+    """Audio key of the article's Hindi summary: its translated summary read in Hindi"""
+    return article.get('audio_key') or tts.register(translate_to_hindi(article['summary']), lang='hi')
+
+def prefetch_article_audio(article):
+    """Start synthesizing the article's Hindi audio summary in the background and return its audio key"""
+    key = article_audio_key(article)
+    tts.prefetch(key)
+    return key
+
+def get_article_audio(article, timeout=None):
+    """Hindi audio summary of an article as audio bytes, synthesized on first request"""
+    return tts.get_audio(article_audio_key(article), timeout=timeout)
+
+@metrics.timed("parse")
+def parse_article_page(html, company_name, backend=None, targeted=None, url=None):
+    """Extract title, content and date from an article page
+    
+    The url's extraction profile is tried first; fields it misses fall back
+    to the generic selectors, then to scanning every paragraph. backend
+    picks the HTML parser (fastest installed by default); targeted parses
+    only the tags and containers the selectors read (parsing.TARGETED_PARSING
+    by default). Returns None if the page has no usable content.
+    """
+    if targeted is None:
+        targeted = parsing.TARGETED_PARSING
+    soup = parsing.make_soup(html, backend, targeted)
+    profile = parsing.profile_for(url)
+    generic = parsing.GENERIC_PROFILE
+    parsing.profile_stats.record(profile, 'pages')
+    
+    # Extract title
+    title = profile.find_title(soup)
+    if title is None and profile is not generic:
+        title = generic.find_title(soup)
+    if not title:
+        title = f"Article about {company_name}"
+    
+    # Extract article content
+    content = profile.find_content(soup)
+    if content:
+        parsing.profile_stats.record(profile, 'hits')
+    elif profile is not generic:
+        parsing.profile_stats.record(profile, 'generic_fallbacks')
+        metrics.incr("generic_selector_fallbacks")
+        content = generic.find_content(soup)
+    
+    if not content:
+        parsing.profile_stats.record(profile, 'paragraph_scans')
+        metrics.incr("paragraph_scans")
+        paragraphs = soup.find_all('p')
+        content = ' '.join([p.get_text().strip() for p in paragraphs if len(p.get_text().strip()) > 50])
+    
+    if not content:
         return None
+    
+    # Extract date
+    date = profile.find_date(soup)
+    if date is None and profile is not generic:
+        date = generic.find_date(soup)
+    
+    if not date:
+        date = "Recent"
+    else:
+        date = format_date(date)
+    
+    return {'title': title, 'content': content, 'date': date}
 
+@metrics.timed("summary")
 def generate_summary(text, company_name):
-    """Generate a summary from the article content"""
+    """Generate a summary from the article content (text or AnalysisDocument)"""
+    doc = AnalysisDocument.of(text)
     try:
-        sentences = sent_tokenize(text)
+        sentences = doc.sentences
         
         if len(sentences) <= 3:
-            return text
+            return doc.text
         
         # Score sentences
         sentence_scores = {}
@@ -259,7 +598,7 @@ def generate_summary(text, company_name):
                 score += 2
             
             # Higher score for medium-length sentences
-            words = len(sentence.split())
+            words = doc.sentence_word_counts[i]
             if 10 <= words <= 25:
                 score += 1
             
@@ -275,68 +614,43 @@ def generate_summary(text, company_name):
         return clean_text(summary)
     except Exception as e:
         logger.error(f"Error generating summary: {e}")
+        metrics.incr("summary_fallbacks")
         # Fallback to simple summary
-        sentences = sent_tokenize(text)
+        sentences = doc.sentences
         return ' '.join(sentences[:min(3, len(sentences))])
 
 def analyze_sentiment(text):
-    """Perform sentiment analysis using TextBlob"""
-    analysis = TextBlob(text)
-    
-    # TextBlob polarity is in range [-1.0, 1.0]
-    polarity = analysis.sentiment.polarity
-    
-    # Determine sentiment label
-    if polarity > 0.1:
-        label = "Positive"
-    elif polarity < -0.1:
-        label = "Negative"
-    else:
-        label = "Neutral"
-    
-    return {'label': label, 'score': polarity}
+    """Perform sentiment analysis with TextBlob's lexicon (polarity in [-1.0, 1.0])"""
+    return analyze_sentiment_batch([text])[0]
+
+@metrics.timed("sentiment")
+def analyze_sentiment_batch(texts):
+    """Sentiment of many texts or AnalysisDocuments in one call; same labels and scores as analyze_sentiment"""
+    return sentiment_engine.analyze_tokens_batch([AnalysisDocument.of(text).sentiment_tokens for text in texts])
 
+@metrics.timed("topics")
 def extract_topics(text, company_name):
-    """Extract key topics from the article"""
+    """Extract key topics from the article (text or AnalysisDocument)"""
     try:
-        # Tokenize text into words
-        words = re.findall(r'\b[A-Za-z][a-z]{2,}\b', text)
-        
-        # Remove stopwords
-        stop_words = set(stopwords.words('english'))
-        filtered_words = [word for word in words if word.lower() not in stop_words]
-        
-        # Count word frequencies
-        word_counts = Counter(filtered_words)
-        
-        # Extract named entities (simple approach for capitalized words)
-        named_entities = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
-        entity_counts = Counter(named_entities)
-        
-        # Combine frequent words and entities
-        topics = [word for word, count in word_counts.most_common(10) if count > 1]
-        topics.extend([entity for entity, count in entity_counts.most_common(5) if count > 1])
-        
-        # Add company name as a topic
-        if company_name not in topics:
-            topics.insert(0, company_name)
-        
-        # Remove duplicates and limit to 5 topics
-        unique_topics = []
-        for topic in topics:
-            if topic not in unique_topics and topic.lower() != company_name.lower():
-                unique_topics.append(topic)
-        
-        final_topics = [company_name] + unique_topics[:4]
-        
-        return final_topics
+        return topic_engine.extract(text, company_name, index=topic_engine.get_index())
     except Exception as e:
         logger.error(f"Error extracting topics: {e}")
+        metrics.incr("topic_fallbacks")
         return [company_name, "Business", "Market"]
 
+@metrics.timed("topics")
+def extract_topics_batch(texts, company_name):
+    """Extract key topics from many articles (texts or AnalysisDocuments) in one call"""
+    try:
+        return topic_engine.extract_batch(texts, company_name, index=topic_engine.get_index())
+    except Exception as e:
+        logger.error(f"Error extracting topics: {e}")
+        metrics.incr("topic_fallbacks")
+        return [[company_name, "Business", "Market"] for _ in texts]
+
 def calculate_reading_time(text):
-    """Calculate estimated reading time in minutes"""
-    words = len(text.split())
+    """Calculate estimated reading time in minutes (text or AnalysisDocument)"""
+    words = AnalysisDocument.of(text).word_count
     minutes = words / 200
 
     if minutes < 1:
@@ -356,136 +670,182 @@ def truncate_text(text, max_length=100):
 
     return text[:max_length].rsplit(' ', 1)[0] + '...'
 
-def generate_comparative_analysis(articles):
-    """Generate comparative analysis across all articles"""
-    # Count sentiments
-    sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
-    sentiment_scores = []
-    all_topics = []
-    
-    for article in articles:
-        sentiment_counts[article['sentiment']['label']] += 1
-        sentiment_scores.append(article['sentiment']['score'])
-        all_topics.extend(article['topics'])
-    
-    # Calculate average sentiment score
-    average_sentiment_score = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
-    
-    # Find common topics
-    topic_counts = Counter(all_topics)
-    common_topics = topic_counts.most_common(10)
-    
-    # Group sources
-    sources = Counter([article['source'] for article in articles])
-    
-    # Generate coverage differences
-    coverage_differences = []
-    
-    # Compare each article with every other article
-    for i, article1 in enumerate(articles):
-        for j, article2 in enumerate(articles[i+1:], i+1):
-            if i != j:
-                # Find differences in sentiment
-                if article1['sentiment']['label'] != article2['sentiment']['label']:
-                    comparison = f"Article {i+1} ({truncate_text(article1['title'], 40)}) is {article1['sentiment']['label'].lower()}, while Article {j+1} ({truncate_text(article2['title'], 40)}) is {article2['sentiment']['label'].lower()}."
-                    
-                    # Determine impact based on sentiment difference
-                    if article1['sentiment']['label'] == "Positive" and article2['sentiment']['label'] == "Negative":
-                        impact = f"This contrast shows varied market sentiment about {article1['topics'][0]}."
-                    elif article1['sentiment']['label'] == "Negative" and article2['sentiment']['label'] == "Positive":
-                        impact = f"This highlights both challenges and opportunities for {article1['topics'][0]}."
-                    else:
-                        impact = "These different perspectives provide a more balanced view of the situation."
-                    
-                    coverage_differences.append({
-                        "Comparison": comparison,
-                        "Impact": impact
-                    })
-                
-                # Find differences in topics
-                topics1 = set(article1['topics'])
-                topics2 = set(article2['topics'])
-                
-                unique_topics1 = topics1 - topics2
-                unique_topics2 = topics2 - topics1
-                
-                if unique_topics1 and unique_topics2:
-                    comparison = f"Article {i+1} focuses on {', '.join(list(unique_topics1)[:2])}, while Article {j+1} covers {', '.join(list(unique_topics2)[:2])}."
-                    impact = f"This shows the diverse aspects of {article1['topics'][0]}'s business being covered in the news."
-                    
-                    coverage_differences.append({
-                        "Comparison": comparison,
-                        "Impact": impact
-                    })
-    
-    # Limit to the most significant differences
-    coverage_differences = coverage_differences[:min(5, len(coverage_differences))]
-    
-    # Calculate topic overlap
-    all_article_topics = [set(article['topics']) for article in articles]
-    if all_article_topics:
-        common_topics_set = set.intersection(*all_article_topics)
-    else:
-        common_topics_set = set()
-    
-    # Find unique topics per article
-    unique_topics_by_article = []
-    for i, article in enumerate(articles):
-        other_topics = []
-        for j, other_article in enumerate(articles):
-            if i != j:
-                other_topics.extend(other_article['topics'])
+def _pair_differences(articles, i, j):
+    """Yield the sentiment and topic contrasts between two articles"""
+    article1, article2 = articles[i], articles[j]
+    # Find differences in sentiment
+    if article1['sentiment']['label'] != article2['sentiment']['label']:
+        comparison = f"Article {i+1} ({truncate_text(article1['title'], 40)}) is {article1['sentiment']['label'].lower()}, while Article {j+1} ({truncate_text(article2['title'], 40)}) is {article2['sentiment']['label'].lower()}."
         
-        unique = [topic for topic in article['topics'] if topic not in other_topics]
-        if unique:
-            unique_topics_by_article.append({
-                "Article": i+1,
-                "Title": truncate_text(article['title'], 40),
-                "Unique Topics": unique
-            })
-    
-    # Build topic overlap structure
-    topic_overlap = {
-        "Common Topics": list(common_topics_set),
-        "Unique Topics": {}
-    }
+        # Determine impact based on sentiment difference
+        if article1['sentiment']['label'] == "Positive" and article2['sentiment']['label'] == "Negative":
+            impact = f"This contrast shows varied market sentiment about {article1['topics'][0]}."
+        elif article1['sentiment']['label'] == "Negative" and article2['sentiment']['label'] == "Positive":
+            impact = f"This highlights both challenges and opportunities for {article1['topics'][0]}."
+        else:
+            impact = "These different perspectives provide a more balanced view of the situation."
+        
+        yield {
+            "Comparison": comparison,
+            "Impact": impact
+        }
+    
+    # Find differences in topics
+    topics1 = set(article1['topics'])
+    topics2 = set(article2['topics'])
+    
+    unique_topics1 = topics1 - topics2
+    unique_topics2 = topics2 - topics1
     
-    for i, article in enumerate(articles):
-        article_unique_topics = []
-        for topic in article['topics']:
-            exists_elsewhere = False
-            for j, other_article in enumerate(articles):
-                if i != j and topic in other_article['topics']:
-                    exists_elsewhere = True
-                    break
+    if unique_topics1 and unique_topics2:
+        comparison = f"Article {i+1} focuses on {', '.join(list(unique_topics1)[:2])}, while Article {j+1} covers {', '.join(list(unique_topics2)[:2])}."
+        impact = f"This shows the diverse aspects of {article1['topics'][0]}'s business being covered in the news."
+        
+        yield {
+            "Comparison": comparison,
+            "Impact": impact
+        }
+
+class ComparativeAccumulator:
+    """Comparative analysis that is updated one article at a time
+    
+    Sentiment counts, the running score total, topic and source counters,
+    the topics mentioned by a single article, the set of topics common to
+    every article and the most divergent article pairs (comparative.PairRanker)
+    are maintained as articles arrive. A snapshot only formats them, so it can
+    be taken after every article (e.g. while the rest are still being fetched).
+    """
+
+    def __init__(self, max_differences=5):
+        self.max_differences = max_differences
+        self.articles = []
+        self.sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
+        self.score_total = 0
+        self.topic_counts = Counter()
+        self.sources = Counter()
+        self.topic_docs = Counter()  # topic -> number of articles mentioning it
+        self.unique_owners = {}  # topic mentioned by one article only -> that article's index
+        self.common_topics_set = set()
+        self.pairs = comparative.PairRanker(max_differences)
+        self._lock = threading.Lock()
+
+    def add(self, article):
+        """Fold one article into the analysis"""
+        with self._lock:
+            index = len(self.articles)
+            self.articles.append(article)
+            self.sentiment_counts[article['sentiment']['label']] += 1
+            self.score_total += article['sentiment']['score']
+            self.topic_counts.update(article['topics'])
+            self.sources[article['source']] += 1
             
-            if not exists_elsewhere and topic not in topic_overlap["Common Topics"]:
-                article_unique_topics.append(topic)
+            topic_set = set(article['topics'])
+            for topic in topic_set:
+                self.topic_docs[topic] += 1
+                if self.topic_docs[topic] == 1:
+                    self.unique_owners[topic] = index
+                else:
+                    self.unique_owners.pop(topic, None)
+            if index == 0:
+                self.common_topics_set = set(topic_set)
+            else:
+                self.common_topics_set = self.common_topics_set.intersection(topic_set)
+            self.pairs.add(article)
+
+    def extend(self, articles):
+        for article in articles:
+            self.add(article)
+
+    def snapshot(self):
+        """The comparative analysis of the articles added so far"""
+        with self._lock:
+            articles = list(self.articles)
+            sentiment_counts = dict(self.sentiment_counts)
+            score_total = self.score_total
+            topic_counts = Counter(self.topic_counts)
+            sources = Counter(self.sources)
+            unique_owners = dict(self.unique_owners)
+            common_topics_set = set(self.common_topics_set)
+            ranked_pairs = self.pairs.ranked()
         
-        if article_unique_topics:
-            topic_overlap["Unique Topics"][f"Article {i+1}"] = article_unique_topics
-    
-    # Generate overall sentiment analysis
-    final_sentiment = ""
-    if average_sentiment_score > 0.2:
-        final_sentiment = f"Overall, the news coverage about {articles[0]['topics'][0]} is predominantly positive, indicating strong market sentiment."
-    elif average_sentiment_score < -0.2:
-        final_sentiment = f"Overall, the news coverage about {articles[0]['topics'][0]} is predominantly negative, suggesting potential challenges ahead."
-    else:
-        final_sentiment = f"Overall, the news coverage about {articles[0]['topics'][0]} is mostly neutral, reflecting a balanced view of the company's current position."
+        # Calculate average sentiment score
+        average_sentiment_score = score_total / len(articles) if articles else 0
+        
+        # Find common topics
+        common_topics = topic_counts.most_common(10)
+        
+        # Describe the most divergent article pairs
+        coverage_differences = []
+        for i, j in ranked_pairs:
+            coverage_differences.extend(_pair_differences(articles, i, j))
+        coverage_differences = coverage_differences[:self.max_differences]
+        
+        # Find unique topics per article: topics no other article mentions
+        unique_topics_by_article = []
+        for i in sorted(set(unique_owners.values())):
+            article = articles[i]
+            unique = [topic for topic in article['topics'] if topic in unique_owners]
+            if unique:
+                unique_topics_by_article.append({
+                    "Article": i+1,
+                    "Title": truncate_text(article['title'], 40),
+                    "Unique Topics": unique
+                })
+        
+        # Build topic overlap structure
+        topic_overlap = {
+            "Common Topics": list(common_topics_set),
+            "Unique Topics": {}
+        }
+        
+        for entry in unique_topics_by_article:
+            article_unique_topics = [topic for topic in entry["Unique Topics"] if topic not in common_topics_set]
+            if article_unique_topics:
+                topic_overlap["Unique Topics"][f"Article {entry['Article']}"] = article_unique_topics
+        
+        # Generate overall sentiment analysis
+        final_sentiment = ""
+        subject = articles[0]['topics'][0] if articles else "the company"
+        if average_sentiment_score > 0.2:
+            final_sentiment = f"Overall, the news coverage about {subject} is predominantly positive, indicating strong market sentiment."
+        elif average_sentiment_score < -0.2:
+            final_sentiment = f"Overall, the news coverage about {subject} is predominantly negative, suggesting potential challenges ahead."
+        else:
+            final_sentiment = f"Overall, the news coverage about {subject} is mostly neutral, reflecting a balanced view of the company's current position."
+        
+        return {
+            'sentiment_counts': sentiment_counts,
+            'average_sentiment_score': average_sentiment_score,
+            'common_topics': common_topics,
+            'coverage_differences': coverage_differences,
+            'topic_overlap': topic_overlap,
+            'unique_topics_by_article': unique_topics_by_article,
+            'sources': sources,
+            'total_articles': len(articles),
+            'final_sentiment_analysis': final_sentiment
+        }
+
+    def overall_summary(self, company_name, comparative_analysis=None):
+        """Overall summary of the articles added so far"""
+        if comparative_analysis is None:
+            comparative_analysis = self.snapshot()
+        with self._lock:
+            articles = list(self.articles)
+        return generate_overall_summary(company_name, articles, comparative_analysis)
+
+@metrics.timed("comparative")
+def generate_comparative_analysis(articles, max_differences=5):
+    """Generate comparative analysis across all articles
     
-    return {
-        'sentiment_counts': sentiment_counts,
-        'average_sentiment_score': average_sentiment_score,
-        'common_topics': common_topics,
-        'coverage_differences': coverage_differences,
-        'topic_overlap': topic_overlap,
-        'unique_topics_by_article': unique_topics_by_article,
-        'sources': sources,
-        'total_articles': len(articles),
-        'final_sentiment_analysis': final_sentiment
-    }
+    Topic overlap comes from per-topic article counts. Coverage differences
+    describe the most divergent article pairs (see comparative.PairRanker);
+    text is only formatted for the selected pairs.
+    """
+    accumulator = ComparativeAccumulator(max_differences)
+    accumulator.extend(articles)
+    return accumulator.snapshot()
 
+@metrics.timed("overall_summary")
 def generate_overall_summary(company_name, articles, comparative_analysis):
     """Generate an overall summary of all the news articles"""
     # Get the most common sentiment
@@ -519,65 +879,58 @@ def generate_overall_summary(company_name, articles, comparative_analysis):
     
     return summary
 
+def build_json_output(company_name, articles, comparative_analysis):
+    """Build the report structure shown in the app's JSON Output tab"""
+    return {
+        "Company": company_name,
+        "Articles": [
+            {
+                "Title": article['title'],
+                "Summary": article['summary'],
+                "Sentiment": article['sentiment']['label'],
+                "Topics": article['topics'],
+                **({"Syndicated By": article['syndicated_by']} if article.get('syndicated_by') else {})
+            } for article in articles
+        ],
+        "Comparative Sentiment Score": {
+            "Sentiment Distribution": comparative_analysis['sentiment_counts'],
+            "Coverage Differences": comparative_analysis['coverage_differences'],
+            "Topic Overlap": {
+                "Common Topics": comparative_analysis['topic_overlap']['Common Topics'],
+                "Most Frequent Topics": comparative_analysis['common_topics']
+            }
+        },
+        "Final Sentiment Analysis": comparative_analysis['final_sentiment_analysis'],
+        "Audio": "[Play Hindi Speech]"
+    }
+
 def text_to_speech_hindi(text):
     """Convert text to Hindi speech"""
-    try:
-        tts = gTTS(text=text, lang='hi', slow=False)
-        audio_io = io.BytesIO()
-        tts.write_to_fp(audio_io)
-        audio_io.seek(0)
-        return audio_io.read()
-    except Exception as e:
-        logger.error(f"Error generating Hindi speech: {e}")
-        # Return an empty audio if there's an error
-        return None
+    return tts.synthesize(text, lang='hi')
+
+def prefetch_speech_hindi(text):
+    """Start converting text to Hindi speech in the background and return its audio key"""
+    key = tts.register(text, lang='hi')
+    tts.prefetch(key)
+    return key
 
+def get_speech(key, timeout=None):
+    """Audio bytes for a key from prefetch_speech_hindi, waiting for the synthesis, or None on failure"""
+    return tts.get_audio(key, timeout=timeout)
+
+@metrics.timed("translate")
 def translate_to_hindi(text):
-    """Translate English text to Hindi using a simple rule-based approach"""
-    # Dictionary mapping for simple translations
-    translations = {
-        "positive": "सकारात्मक",
-        "negative": "नकारात्मक",
-        "neutral": "तटस्थ",
-        "articles": "लेख",
-        "summary": "सारांश",
-        "analysis": "विश्लेषण",
-        "news": "समाचार",
-        "sentiment": "भावना",
-        "topics": "विषय",
-        "overall": "समग्र",
-        "company": "कंपनी",
-        "based on": "के आधार पर",
-        "main": "मुख्य",
-        "discussed": "चर्चा की गई",
-        "coverage": "कवरेज",
-        "highlights": "हाइलाइट्स",
-        "concerns about": "के बारे में चिंताएँ",
-        "includes": "शामिल है",
-        "predominantly": "मुख्य रूप से",
-        "mostly": "ज्यादातर",
-        "with": "के साथ",
-        "score": "स्कोर",
-        "and": "और",
-        "are": "हैं",
-        "is": "है",
-        "the": "",
-        "a": "एक",
-        "about": "के बारे में"
-    }
+    """Translate English text to Hindi using a simple rule-based approach
     
-    # Replace known words with Hindi equivalents
-    for eng, hindi in translations.items():
-        text = re.sub(r'\b' + eng + r'\b', hindi, text, flags=re.IGNORECASE)
-    
-    # Keep company names as is
-    common_companies = ["Tesla", "Apple", "Google", "Microsoft", "Amazon", "Samsung", "Tata", "Reliance", "Infosys", "TCS"]
-    for company in common_companies:
-        if company.lower() in text.lower():
-            pattern = re.compile(re.escape(company), re.IGNORECASE)
-            text = pattern.sub(company, text)
-    
-    return text
+    Glossary phrases are replaced in one pass, longest phrase first (see
+    translation.Glossary); results are memoized.
+    """
+    return translation.translate(text)
+
+@metrics.timed("translate")
+def translate_to_hindi_batch(texts):
+    """Translate several texts to Hindi in one call, in order; duplicates are translated once"""
+    return translation.translate_batch(texts)
 
 def generate_mock_article(company_name, index):
     """Generate mock article data for testing/development"""
@@ -659,7 +1012,7 @@ def generate_mock_article(company_name, index):
     day = random.randint(1, 28)
     date = f"2025-{month:02d}-{day:02d}"
     
-    return {
+    return _with_audio_key({
         'title': title,
         'summary': summary,
         'content': content,
@@ -669,4 +1022,4 @@ def generate_mock_article(company_name, index):
         'sentiment': {'label': sentiment_label, 'score': sentiment_score},
         'topics': selected_topics,
         'reading_time': "About 1 minute"
-    }
\ No newline at end of file
+    })
\ No newline at end of file
@@ -1,13 +1,17 @@
 import streamlit as st
 import pandas as pd
 import json
+import time
+import tts
 from api import (
-    fetch_news,
+    iter_news,
     analyze_sentiment,
-    generate_comparative_analysis,
-    text_to_speech_hindi,
+    ComparativeAccumulator,
+    prefetch_article_audio,
+    prefetch_speech_hindi,
+    get_speech,
     translate_to_hindi,
-    generate_overall_summary
+    build_json_output
 )
 from utils import (
     clean_text,
@@ -116,191 +120,333 @@ num_articles = 5
 # Set language to Hindi only
 selected_language = "Hindi"  # Removed the radio option
 
+# Seconds a finished analysis is reused before the news is fetched again
+RESULT_TTL = 30 * 60
+
+# Seconds to wait for the Hindi audio once the articles are shown; clips that
+# take longer are shown as not ready and picked up on a later rerun
+AUDIO_TIMEOUT = 20
+
 # Progress view holder
 progress_placeholder = st.empty()
 
+# Finished analyses shared by every session, keyed by (company, number of articles)
+@st.cache_resource
+def get_result_store():
+    return {}
+
+def get_cached_analysis(company_name, num_articles):
+    """
+    Return the stored analysis for the company if it is still fresh
+    """
+    analysis = get_result_store().get((company_name.strip().lower(), num_articles))
+    if analysis and time.time() - analysis['cached_at'] < RESULT_TTL:
+        return analysis
+    return None
+
+def store_analysis(analysis):
+    """
+    Store a finished analysis, dropping any that have expired
+    """
+    store = get_result_store()
+    now = time.time()
+    for key in [key for key, cached in store.items() if now - cached['cached_at'] >= RESULT_TTL]:
+        store.pop(key, None)
+    store[(analysis['company'].strip().lower(), analysis['num_articles'])] = analysis
+
+# Ask for the shown analysis to be recomputed on the next run
+def request_refresh():
+    st.session_state['refresh_requested'] = True
+
 # Main function to analyze news
-def analyze_company_news(company_name, num_articles):
+def analyze_company_news(company_name, num_articles, use_cache=True):
     """
-    Analyze news for the given company
+    Analyze news for the given company, yielding each article as soon as it is ready
+    
+    use_cache=False refetches search pages and articles instead of reusing cached copies
     """
     # Display progress
-    progress_bar = progress_placeholder.progress(0)
-    progress_text = progress_placeholder.empty()
+    progress_area = progress_placeholder.container()
+    progress_bar = progress_area.progress(0)
+    progress_text = progress_area.empty()
     
     # Fetch news data
     progress_text.text("Fetching news articles...")
-    news_data = fetch_news(company_name, num_articles)
-    progress_bar.progress(50)
-    
-    # Update progress
-    progress_text.text("Analyzing content and generating summaries...")
-    progress_bar.progress(100)
+    for count, article in enumerate(iter_news(company_name, num_articles, use_cache=use_cache), start=1):
+        progress_bar.progress(int(count * 100 / num_articles))
+        progress_text.text(f"Analyzed {count} of {num_articles} articles...")
+        yield article
     
     # Clear progress indicators
-    progress_bar.empty()
-    progress_text.empty()
-    
-    return news_data
+    progress_placeholder.empty()
 
-# Generate a play button for audio
-def get_audio_button(text, language="en", button_text="Listen"):
-    audio_file = text_to_speech_hindi(text) if language == "hi" else None
+# Generate a play button for audio in the speech backend's format, or say why there is none
+def get_audio_button(audio_file, pending=False):
     if audio_file:
-        return st.audio(audio_file, format="audio/mp3")
+        return st.audio(audio_file, format=tts.get_backend().mime)
+    if pending:
+        st.caption("Generating Hindi audio...")
+    else:
+        st.caption("Hindi audio is not ready yet. It will play here once it has been generated.")
     return None
 
+# Pick up audio that was not ready when the analysis was stored
+def fill_missing_audio(analysis):
+    for i, (hindi_article_summary, article_audio) in enumerate(analysis['article_hindi']):
+        if article_audio is None:
+            analysis['article_hindi'][i] = (hindi_article_summary, get_speech(analysis['article_audio_keys'][i], timeout=0))
+    if analysis['audio_file'] is None:
+        analysis['audio_file'] = get_speech(analysis['audio_key'], timeout=0)
+
+# Display a single article inside its tab
+def render_article(article, hindi_article_summary, article_audio, audio_pending=False):
+    # Article header
+    st.markdown(f"<h3 class='article-title'>{article['title']}</h3>", unsafe_allow_html=True)
+    st.markdown(f"<p class='article-source'>Source: {article['source']} | Date: {article['date']} | Reading time: {article['reading_time']}</p>", unsafe_allow_html=True)
+    if article.get('syndicated_by'):
+        st.markdown(f"<p class='article-source'>Also published by: {', '.join(article['syndicated_by'])}</p>", unsafe_allow_html=True)
+    
+    # Summary and sentiment
+    st.markdown("### Summary")
+    st.markdown(f"{article['summary']}")
+    
+    # Audio option for Hindi; the slot is filled later when the audio is still being generated
+    with st.expander("Hindi Summary"):
+        st.markdown(hindi_article_summary)
+        audio_slot = st.empty()
+        with audio_slot:
+            get_audio_button(article_audio, audio_pending)
+    
+    sentiment = article['sentiment']
+    sentiment_class = "sentiment-positive" if sentiment['label'] == "Positive" else ("sentiment-negative" if sentiment['label'] == "Negative" else "sentiment-neutral")
+    
+    st.markdown(f"### Sentiment: <span class='{sentiment_class}'>{sentiment['label']} ({sentiment['score']:.2f})</span>", unsafe_allow_html=True)
+    
+    # Topics
+    st.markdown("### Topics")
+    topics_html = ""
+    for topic in article['topics']:
+        topics_html += f"<span class='topic-tag'>{topic}</span>"
+    st.markdown(f"<div>{topics_html}</div>", unsafe_allow_html=True)
+    
+    # Full content in expander
+    with st.expander("View Full Article Content"):
+        st.markdown(article['content'])
+        st.markdown(f"[Read original article]({article['url']})")
+    
+    return audio_slot
+
+# Display the overview; while articles are still arriving (analysis is None) it
+# is rendered from a partial comparative analysis, without the Hindi summary
+def render_overview(company_name, news_data, comparative_analysis, overall_summary, analysis=None):
+    if analysis is None:
+        st.caption(f"Analyzed {len(news_data)} of {num_articles} articles so far...")
+    else:
+        # Cache status and refresh control
+        cached_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(analysis['cached_at']))
+        status_col, refresh_col = st.columns([4, 1])
+        status_col.caption(f"Results for {company_name} cached at {cached_at}")
+        refresh_col.button("Refresh", key="refresh", on_click=request_refresh)
+    
+    # ---------- Display Results ----------
+    
+    # Overall Summary Section
+    st.header("📊 Overall Analysis")
+    st.markdown(f"<div class='summary-box'>{overall_summary}</div>", unsafe_allow_html=True)
+    
+    if analysis is not None:
+        # Hindi translation and audio since language is fixed to Hindi
+        st.subheader("Hindi Summary")
+        st.markdown(f"<div class='summary-box'>{analysis['hindi_summary']}</div>", unsafe_allow_html=True)
+        st.subheader("Audio Summary (Hindi)")
+        get_audio_button(analysis['audio_file'])
+    
+    # Sentiment Distribution
+    st.subheader("Sentiment Distribution")
+    
+    # Create columns for the sentiment counts
+    col1, col2, col3 = st.columns(3)
+    
+    sentiment_counts = comparative_analysis['sentiment_counts']
+    with col1:
+        st.metric(
+            label="Positive",
+            value=sentiment_counts['Positive'],
+            delta=f"{(sentiment_counts['Positive']/len(news_data)*100):.0f}%"
+        )
+    
+    with col2:
+        st.metric(
+            label="Neutral",
+            value=sentiment_counts['Neutral'],
+            delta=f"{(sentiment_counts['Neutral']/len(news_data)*100):.0f}%"
+        )
+    
+    with col3:
+        st.metric(
+            label="Negative",
+            value=sentiment_counts['Negative'],
+            delta=f"{(sentiment_counts['Negative']/len(news_data)*100):.0f}%"
+        )
+    
+    # Average sentiment
+    avg_score = comparative_analysis['average_sentiment_score']
+    sentiment_class = "sentiment-positive" if avg_score > 0.1 else ("sentiment-negative" if avg_score < -0.1 else "sentiment-neutral")
+    sentiment_label = "Positive" if avg_score > 0.1 else ("Negative" if avg_score < -0.1 else "Neutral")
+    
+    st.markdown(f"<p>Average Sentiment: <span class='{sentiment_class}'>{sentiment_label} ({avg_score:.2f})</span></p>", unsafe_allow_html=True)
+    
+    # Topic Overlap Section
+    st.subheader("Topic Analysis")
+    
+    # Common Topics
+    st.markdown("#### Common Topics Across Articles")
+    common_topics = comparative_analysis['topic_overlap']['Common Topics']
+    
+    if common_topics:
+        topics_html = ""
+        for topic in common_topics:
+            topics_html += f"<span class='topic-tag'>{topic}</span>"
+        st.markdown(f"<div class='overlap-box'>{topics_html}</div>", unsafe_allow_html=True)
+    else:
+        st.markdown("No common topics found across all articles.")
+    
+    # Most Frequent Topics
+    st.markdown("#### Most Frequent Topics")
+    topics_html = ""
+    for topic, count in comparative_analysis['common_topics'][:8]:
+        topics_html += f"<span class='topic-tag'>{topic} ({count})</span>"
+    
+    st.markdown(f"<div>{topics_html}</div>", unsafe_allow_html=True)
+    
+    # Unique Topics by Article
+    st.markdown("#### Unique Topics by Article")
+    unique_topics = comparative_analysis['unique_topics_by_article']
+    
+    if unique_topics:
+        for unique in unique_topics:
+            st.markdown(f"{unique['Title']}: " + ", ".join(unique['Unique Topics']))
+    else:
+        st.markdown("No unique topics identified.")
+    
+    # Coverage Differences in table format
+    st.subheader("Coverage Differences")
+    coverage_differences = comparative_analysis['coverage_differences']
+    
+    if coverage_differences:
+        # Create a table for coverage differences
+        df_coverage = pd.DataFrame(coverage_differences)
+        st.table(df_coverage)
+    else:
+        st.markdown("No significant coverage differences identified.")
+
 # Analysis button
-if st.button("Analyze Company News"):
-    if not custom_company:
+analyze_clicked = st.button("Analyze Company News")
+refresh_clicked = st.session_state.pop('refresh_requested', False)
+
+# Results are kept in session state so reruns from other widgets show them again without recomputing
+if analyze_clicked or refresh_clicked or 'analysis' in st.session_state:
+    if analyze_clicked and not custom_company:
         st.error("Please enter a company name")
     else:
-        # Fetch and analyze news
-        news_data = analyze_company_news(custom_company, num_articles)
+        if analyze_clicked:
+            company_name = custom_company
+            analysis = get_cached_analysis(company_name, num_articles)
+        else:
+            company_name = st.session_state['analysis']['company']
+            analysis = None if refresh_clicked else st.session_state['analysis']
         
-        if news_data:
-            # Generate comparative analysis
-            comparative_analysis = generate_comparative_analysis(news_data)
+        # Create tabs for different views
+        tab1, tab2 = st.tabs(["Analysis Dashboard", "JSON Output"])
+        
+        with tab1:
+            # Reserve the layout so articles can be shown while the rest are still being fetched
+            overview_section = st.container()
+            overview_slot = overview_section.empty()
             
-            # Generate overall summary
-            overall_summary = generate_overall_summary(custom_company, news_data, comparative_analysis)
+            # Individual Articles
+            st.header("Individual Articles Analysis")
+            article_tabs = st.tabs([f"Article {i+1}" for i in range(num_articles)])
             
-            # Create tabs for different views
-            tab1, tab2 = st.tabs(["Analysis Dashboard", "JSON Output"])
+            closing_section = st.container()
+        
+        if analysis is None:
+            # Fetch and analyze news, rendering each article as it arrives
+            news_data = []
+            pending_audio = []
+            accumulator = ComparativeAccumulator()
+            # A refresh must fetch new articles rather than the cached ones
+            for i, article in enumerate(analyze_company_news(company_name, num_articles, use_cache=not refresh_clicked)):
+                hindi_article_summary = translate_to_hindi(article['summary'])
+                # Synthesize the article's audio (shared with the API service) in the background
+                # so a TTS round trip never holds up the next article
+                audio_key = prefetch_article_audio(article)
+                with article_tabs[i]:
+                    audio_slot = render_article(article, hindi_article_summary, None, audio_pending=True)
+                news_data.append(article)
+                pending_audio.append((hindi_article_summary, audio_key, audio_slot))
+                
+                # Refresh the overview with the articles seen so far
+                accumulator.add(article)
+                partial_analysis = accumulator.snapshot()
+                with overview_slot.container():
+                    render_overview(company_name, news_data, partial_analysis, accumulator.overall_summary(company_name, partial_analysis))
             
-            with tab1:
-                # ---------- Display Results ----------
-
-                # Overall Summary Section
-                st.header("📊 Overall Analysis")
-                st.markdown(f"<div class='summary-box'>{overall_summary}</div>", unsafe_allow_html=True)
+            # Collect the article audio now that every article is on screen, waiting
+            # at most AUDIO_TIMEOUT in total
+            audio_deadline = time.monotonic() + AUDIO_TIMEOUT
+            article_hindi = []
+            article_audio_keys = []
+            for hindi_article_summary, audio_key, audio_slot in pending_audio:
+                article_audio = get_speech(audio_key, timeout=max(0, audio_deadline - time.monotonic()))
+                with audio_slot:
+                    get_audio_button(article_audio)
+                article_hindi.append((hindi_article_summary, article_audio))
+                article_audio_keys.append(audio_key)
+            
+            if news_data:
+                # Comparative analysis and overall summary of every article
+                comparative_analysis = accumulator.snapshot()
+                overall_summary = accumulator.overall_summary(company_name, comparative_analysis)
                 
                 # Hindi translation and audio since language is fixed to Hindi
                 hindi_summary = translate_to_hindi(overall_summary)
-                st.subheader("Hindi Summary")
-                st.markdown(f"<div class='summary-box'>{hindi_summary}</div>", unsafe_allow_html=True)
-                st.subheader("Audio Summary (Hindi)")
-                get_audio_button(hindi_summary, "hi", "Play Hindi Summary")
-                
-                # Sentiment Distribution
-                st.subheader("Sentiment Distribution")
-                
-                # Create columns for the sentiment counts
-                col1, col2, col3 = st.columns(3)
-                
-                sentiment_counts = comparative_analysis['sentiment_counts']
-                with col1:
-                    st.metric(
-                        label="Positive",
-                        value=sentiment_counts['Positive'],
-                        delta=f"{(sentiment_counts['Positive']/len(news_data)*100):.0f}%"
-                    )
-                
-                with col2:
-                    st.metric(
-                        label="Neutral",
-                        value=sentiment_counts['Neutral'],
-                        delta=f"{(sentiment_counts['Neutral']/len(news_data)*100):.0f}%"
-                    )
-                
-                with col3:
-                    st.metric(
-                        label="Negative",
-                        value=sentiment_counts['Negative'],
-                        delta=f"{(sentiment_counts['Negative']/len(news_data)*100):.0f}%"
-                    )
-                
-                # Average sentiment
-                avg_score = comparative_analysis['average_sentiment_score']
-                sentiment_class = "sentiment-positive" if avg_score > 0.1 else ("sentiment-negative" if avg_score < -0.1 else "sentiment-neutral")
-                sentiment_label = "Positive" if avg_score > 0.1 else ("Negative" if avg_score < -0.1 else "Neutral")
-                
-                st.markdown(f"<p>Average Sentiment: <span class='{sentiment_class}'>{sentiment_label} ({avg_score:.2f})</span></p>", unsafe_allow_html=True)
-                
-                # Topic Overlap Section
-                st.subheader("Topic Analysis")
-                
-                # Common Topics
-                st.markdown("#### Common Topics Across Articles")
-                common_topics = comparative_analysis['topic_overlap']['Common Topics']
-                
-                if common_topics:
-                    topics_html = ""
-                    for topic in common_topics:
-                        topics_html += f"<span class='topic-tag'>{topic}</span>"
-                    st.markdown(f"<div class='overlap-box'>{topics_html}</div>", unsafe_allow_html=True)
-                else:
-                    st.markdown("No common topics found across all articles.")
-                
-                # Most Frequent Topics
-                st.markdown("#### Most Frequent Topics")
-                topics_html = ""
-                for topic, count in comparative_analysis['common_topics'][:8]:
-                    topics_html += f"<span class='topic-tag'>{topic} ({count})</span>"
-                
-                st.markdown(f"<div>{topics_html}</div>", unsafe_allow_html=True)
-                
-                # Unique Topics by Article
-                st.markdown("#### Unique Topics by Article")
-                unique_topics = comparative_analysis['unique_topics_by_article']
-                
-                if unique_topics:
-                    for unique in unique_topics:
-                        st.markdown(f"{unique['Title']}: " + ", ".join(unique['Unique Topics']))
-                else:
-                    st.markdown("No unique topics identified.")
-                
-                # Coverage Differences in table format
-                st.subheader("Coverage Differences")
-                coverage_differences = comparative_analysis['coverage_differences']
-                
-                if coverage_differences:
-                    # Create a table for coverage differences
-                    df_coverage = pd.DataFrame(coverage_differences)
-                    st.table(df_coverage)
-                else:
-                    st.markdown("No significant coverage differences identified.")
-                
-                # Individual Articles
-                st.header("Individual Articles Analysis")
-                
-                # Create tabs
-                tab_labels = [f"Article {i+1}" for i in range(len(news_data))]
-                article_tabs = st.tabs(tab_labels)
-                
-                for i, (tab, article) in enumerate(zip(article_tabs, news_data)):
-                    with tab:
-                        # Article header
-                        st.markdown(f"<h3 class='article-title'>{article['title']}</h3>", unsafe_allow_html=True)
-                        st.markdown(f"<p class='article-source'>Source: {article['source']} | Date: {article['date']} | Reading time: {article['reading_time']}</p>", unsafe_allow_html=True)
-                        
-                        # Summary and sentiment
-                        st.markdown("### Summary")
-                        st.markdown(f"{article['summary']}")
-                        
-                        # Audio option for Hindi
-                        hindi_article_summary = translate_to_hindi(article['summary'])
-                        with st.expander("Hindi Summary"):
-                            st.markdown(hindi_article_summary)
-                            get_audio_button(hindi_article_summary, "hi", "Play Hindi Summary")
-                        
-                        sentiment = article['sentiment']
-                        sentiment_class = "sentiment-positive" if sentiment['label'] == "Positive" else ("sentiment-negative" if sentiment['label'] == "Negative" else "sentiment-neutral")
-                        
-                        st.markdown(f"### Sentiment: <span class='{sentiment_class}'>{sentiment['label']} ({sentiment['score']:.2f})</span>", unsafe_allow_html=True)
-                        
-                        # Topics
-                        st.markdown("### Topics")
-                        topics_html = ""
-                        for topic in article['topics']:
-                            topics_html += f"<span class='topic-tag'>{topic}</span>"
-                        st.markdown(f"<div>{topics_html}</div>", unsafe_allow_html=True)
-                        
-                        # Full content in expander
-                        with st.expander("View Full Article Content"):
-                            st.markdown(article['content'])
-                            st.markdown(f"[Read original article]({article['url']})")
+                audio_key = prefetch_speech_hindi(hindi_summary)
+                with st.spinner("Generating Hindi audio..."):
+                    audio_file = get_speech(audio_key, timeout=AUDIO_TIMEOUT)
                 
+                analysis = {
+                    'company': company_name,
+                    'num_articles': num_articles,
+                    'news_data': news_data,
+                    'article_hindi': article_hindi,
+                    'article_audio_keys': article_audio_keys,
+                    'comparative_analysis': comparative_analysis,
+                    'overall_summary': overall_summary,
+                    'hindi_summary': hindi_summary,
+                    'audio_file': audio_file,
+                    'audio_key': audio_key,
+                    'cached_at': time.time()
+                }
+                store_analysis(analysis)
+        else:
+            fill_missing_audio(analysis)
+            news_data = analysis['news_data']
+            for i, article in enumerate(news_data):
+                with article_tabs[i]:
+                    render_article(article, *analysis['article_hindi'][i])
+        
+        if news_data:
+            st.session_state['analysis'] = analysis
+            comparative_analysis = analysis['comparative_analysis']
+            overall_summary = analysis['overall_summary']
+            hindi_summary = analysis['hindi_summary']
+            audio_file = analysis['audio_file']
+            
+            with overview_slot.container():
+                render_overview(company_name, news_data, comparative_analysis, overall_summary, analysis)
+            
+            with closing_section:
                 # Final Sentiment Analysis
                 st.header("Final Sentiment Analysis")
                 st.markdown(f"<div class='summary-box'>{comparative_analysis['final_sentiment_analysis']}</div>", unsafe_allow_html=True)
@@ -308,55 +454,32 @@ if st.button("Analyze Company News"):
                 # Hindi Audio summary
                 st.header("Audio Summary (Hindi)")
                 
-                # Translate summary to Hindi
-                hindi_summary = translate_to_hindi(overall_summary)
-                
                 # Display Hindi text
                 with st.expander("View Hindi Text"):
                     st.text(hindi_summary)
                 
-                # Generate and play audio
-                with st.spinner("Generating Hindi audio..."):
-                    audio_file = text_to_speech_hindi(hindi_summary)
-                    st.audio(audio_file, format="audio/mp3")
+                # Play audio
+                get_audio_button(audio_file)
                 
                 # Export options
                 st.header("Export Results")
                 
                 # Audio download
-                st.download_button(
-                    label="Download Audio Summary (Hindi)",
-                    data=audio_file,
-                    file_name=f"{custom_company}_summary_hindi.mp3",
-                    mime="audio/mp3"
-                )
+                if audio_file:
+                    backend = tts.get_backend()
+                    st.download_button(
+                        label="Download Audio Summary (Hindi)",
+                        data=audio_file,
+                        file_name=f"{company_name}_summary_hindi.{backend.extension}",
+                        mime=backend.mime
+                    )
             
             with tab2:
                 # JSON Output View
                 st.header("JSON Output Format")
                 
                 # Prepare JSON data
-                json_data = {
-                    "Company": custom_company,
-                    "Articles": [
-                        {
-                            "Title": article['title'],
-                            "Summary": article['summary'],
-                            "Sentiment": article['sentiment']['label'],
-                            "Topics": article['topics']
-                        } for article in news_data
-                    ],
-                    "Comparative Sentiment Score": {
-                        "Sentiment Distribution": comparative_analysis['sentiment_counts'],
-                        "Coverage Differences": comparative_analysis['coverage_differences'],
-                        "Topic Overlap": {
-                            "Common Topics": comparative_analysis['topic_overlap']['Common Topics'],
-                            "Most Frequent Topics": comparative_analysis['common_topics']
-                        }
-                    },
-                    "Final Sentiment Analysis": comparative_analysis['final_sentiment_analysis'],
-                    "Audio": "[Play Hindi Speech]"
-                }
+                json_data = build_json_output(company_name, news_data, comparative_analysis)
                 
                 # Display JSON
                 st.json(json_data)
@@ -367,7 +490,7 @@ if st.button("Analyze Company News"):
                 st.download_button(
                     label="Download Analysis Report (JSON)",
                     data=json_str,
-                    file_name=f"{custom_company}_analysis.json",
+                    file_name=f"{company_name}_analysis.json",
                     mime="application/json"
                 )
         else:
@@ -0,0 +1,173 @@
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from api import (
+    FETCH_MODES,
+    fetch_news,
+    generate_comparative_analysis,
+    generate_overall_summary,
+    build_json_output
+)
+from utils import create_cache_dir
+import http_client
+import metrics
+import topics
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("fetch", "comparative", "summary", "write")
+DEFAULT_OUTPUT_DIR = "reports"
+
+# Read company names from a watchlist file, one per line; blank lines and # comments are skipped
+def read_watchlist(path):
+    companies = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as watchlist:
+        for line in watchlist:
+            company = line.split('#', 1)[0].strip()
+            if company and company.lower() not in seen:
+                seen.add(company.lower())
+                companies.append(company)
+    return companies
+
+# File name for each company's report; names that slug alike ("AT&T", "AT T")
+# get -2, -3, ... suffixes in watchlist order
+def report_paths(output_dir, companies):
+    paths = {}
+    taken = set()
+    for company_name in companies:
+        slug = re.sub(r'[^a-z0-9]+', '-', company_name.lower()).strip('-') or "company"
+        name = slug
+        suffix = 2
+        while name in taken:
+            name = f"{slug}-{suffix}"
+            suffix += 1
+        taken.add(name)
+        paths[company_name] = os.path.join(output_dir, f"{name}.json")
+    return paths
+
+def analyze_company(company_name, num_articles, path, mode="thread", use_cache=True, profile=None):
+    """Run the pipeline for one company and write its JSON report to path
+
+    Runs in a worker process; returns the report path, article count and
+    per-stage timings in seconds. profile names a profiling engine
+    (see metrics.PROFILE_ENGINES) whose report is written next to the JSON.
+    """
+    try:
+        if profile is None:
+            return _analyze_company(company_name, num_articles, path, mode, use_cache)
+        # The extension follows the engine actually used, which may be the cProfile fallback
+        engine = metrics.profile_engine(profile)
+        with metrics.capture(os.path.splitext(path)[0] + "." + metrics.PROFILE_EXTENSIONS[engine], engine):
+            return _analyze_company(company_name, num_articles, path, mode, use_cache)
+    finally:
+        # Pool workers exit without running atexit handlers
+        topics.save_index()
+
+def _analyze_company(company_name, num_articles, path, mode, use_cache):
+    timings = {}
+
+    start = time.perf_counter()
+    articles = fetch_news(company_name, num_articles, mode=mode, use_cache=use_cache)
+    timings['fetch'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    comparative_analysis = generate_comparative_analysis(articles)
+    timings['comparative'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    overall_summary = generate_overall_summary(company_name, articles, comparative_analysis)
+    timings['summary'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = build_json_output(company_name, articles, comparative_analysis)
+    report["Overall Summary"] = overall_summary
+    with open(path, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, indent=2, ensure_ascii=False)
+    timings['write'] = time.perf_counter() - start
+
+    return {'company': company_name, 'path': path, 'articles': len(articles), 'timings': timings}
+
+def run_batch(companies, num_articles=5, workers=None, output_dir=DEFAULT_OUTPUT_DIR, mode="thread", use_cache=True, profile=None):
+    """Analyze every company on a process pool and return the run statistics
+
+    Workers share the on-disk article, search page and topic caches. A company
+    that fails is logged and counted; the rest of the batch carries on.
+    """
+    create_cache_dir(output_dir)
+    paths = report_paths(output_dir, companies)
+    workers = workers or os.cpu_count() or 1
+    results = []
+    failures = []
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=http_client.reset) as executor:
+        futures = {
+            executor.submit(analyze_company, company, num_articles, paths[company], mode, use_cache, profile): company
+            for company in companies
+        }
+        for future in as_completed(futures):
+            company = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error analyzing {company}: {e}")
+                failures.append(company)
+                continue
+            results.append(result)
+            logger.info(f"[{len(results) + len(failures)}/{len(companies)}] {company}: {result['articles']} articles -> {result['path']}")
+    elapsed = time.perf_counter() - start
+
+    return {
+        'companies': len(companies),
+        'succeeded': len(results),
+        'failed': failures,
+        'articles': sum(result['articles'] for result in results),
+        'elapsed': elapsed,
+        'workers': workers,
+        'stage_totals': {stage: sum(result['timings'][stage] for result in results) for stage in STAGES},
+    }
+
+def format_stats(stats):
+    """Human readable throughput and per-stage timing report"""
+    elapsed = stats['elapsed'] or 1e-9
+    lines = [
+        f"Analyzed {stats['succeeded']}/{stats['companies']} companies ({stats['articles']} articles) "
+        f"in {stats['elapsed']:.1f}s with {stats['workers']} workers",
+        f"Throughput: {stats['succeeded'] / elapsed * 60:.1f} companies/min, {stats['articles'] / elapsed:.2f} articles/s",
+        "Stage timings (summed over workers):",
+    ]
+    for stage in STAGES:
+        total = stats['stage_totals'][stage]
+        mean = total / stats['succeeded'] if stats['succeeded'] else 0
+        lines.append(f"  {stage:<12} total {total:8.2f}s  mean {mean:7.3f}s/company")
+    if stats['failed']:
+        lines.append(f"Failed: {', '.join(stats['failed'])}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze news for a watchlist of companies and write one JSON report per company")
+    parser.add_argument("watchlist", help="File with one company name per line")
+    parser.add_argument("-n", "--num-articles", type=int, default=5, help="Articles per company (default: 5)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output-dir", default=DEFAULT_OUTPUT_DIR, help=f"Directory for the reports (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--mode", choices=FETCH_MODES, default="thread", help="Fetch engine used inside each worker")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the article and search page caches")
+    parser.add_argument("--profile", choices=metrics.PROFILE_ENGINES, help="Profile each company and write the report next to its JSON")
+    args = parser.parse_args(argv)
+
+    companies = read_watchlist(args.watchlist)
+    if not companies:
+        parser.error(f"No companies found in {args.watchlist}")
+
+    stats = run_batch(companies, args.num_articles, args.workers, args.output_dir, args.mode, not args.no_cache, args.profile)
+    print(format_stats(stats))
+    return 1 if stats['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
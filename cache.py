@@ -0,0 +1,213 @@
+import os
+import time
+import hashlib
+import threading
+import logging
+from collections import defaultdict
+
+from utils import create_cache_dir, get_cached_data, save_cached_data, normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Article cache settings
+ARTICLE_CACHE_DIR = os.path.join("cache", "articles")
+ARTICLE_TTL = 6 * 60 * 60    # Seconds before a cached article is revalidated
+ARTICLE_MAX_ENTRIES = 1000   # Least recently used entries are evicted beyond this
+
+# Search page cache settings
+PAGE_CACHE_DIR = os.path.join("cache", "pages")
+PAGE_TTL = 10 * 60           # Search results go stale much faster than articles
+PAGE_MAX_ENTRIES = 500
+
+def source_domain(url):
+    """Domain used to group cache statistics"""
+    return normalize_url(url).split('//', 1)[-1].split('/', 1)[0].replace('www.', '')
+
+class CacheStats:
+    """Per-domain hit, miss and revalidation counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: {'hits': 0, 'misses': 0, 'revalidated': 0})
+
+    def record(self, url, outcome):
+        """Count one lookup outcome: 'hits', 'misses' or 'revalidated'"""
+        with self._lock:
+            self._counts[source_domain(url)][outcome] += 1
+
+    def snapshot(self):
+        """Return a copy of the counters, keyed by domain"""
+        with self._lock:
+            return {domain: dict(counts) for domain, counts in self._counts.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+stats = CacheStats()
+
+class DiskCache:
+    """Size-capped on-disk cache of JSON entries with TTL and LRU eviction
+    
+    Each entry is one JSON file written atomically. File mtimes record recency,
+    so LRU order survives restarts and is shared between processes. Every write
+    lists the directory, so the cap counts entries written by other processes
+    (e.g. batch workers) too; the entries are only stat'ed when over the cap.
+    Expired entries are kept so their HTTP validators can be used for
+    revalidation.
+    """
+
+    def __init__(self, cache_dir, ttl, max_entries):
+        self.cache_dir = create_cache_dir(cache_dir)
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def _path(self, raw_key):
+        return os.path.join(self.cache_dir, hashlib.sha256(raw_key.encode('utf-8')).hexdigest() + ".json")
+
+    def _scan(self):
+        """Paths of every stored entry, whichever process wrote it"""
+        with os.scandir(self.cache_dir) as entries:
+            return [entry.path for entry in entries if entry.name.endswith(".json")]
+
+    def _evict(self, keep):
+        """Remove least recently used entries over max_entries, never keep"""
+        paths = self._scan()
+        excess = len(paths) - self.max_entries
+        if excess <= 0:
+            return
+        last_used = {}
+        for path in paths:
+            try:
+                last_used[path] = os.stat(path).st_mtime
+            except FileNotFoundError:
+                # Already evicted by another process
+                excess -= 1
+        last_used.pop(keep, None)
+        for victim in sorted(last_used, key=last_used.get)[:max(excess, 0)]:
+            self._remove(victim)
+
+    def is_fresh(self, entry):
+        """True if the entry is younger than the TTL"""
+        return time.time() - entry.get('cached_at', 0) <= self.ttl
+
+    def get_entry(self, raw_key):
+        """Return the stored entry, fresh or expired, or None"""
+        path = self._path(raw_key)
+        try:
+            entry = get_cached_data(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            self._remove(path)
+            return None
+        if entry is None:
+            return None
+        
+        # Touch the file to mark it most recently used
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except FileNotFoundError:
+            pass
+        return entry
+
+    def put_entry(self, raw_key, entry):
+        """Store an entry and evict least recently used entries over the cap"""
+        path = self._path(raw_key)
+        entry['cached_at'] = time.time()
+        try:
+            save_cached_data(entry, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Error writing cache entry {path}: {e}")
+            return
+        self._evict(path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def entries(self):
+        """Yield every readable stored entry, fresh or expired, without touching its recency"""
+        for path in self._scan():
+            try:
+                entry = get_cached_data(path)
+            except (OSError, ValueError):
+                continue
+            if entry is not None:
+                yield entry
+
+    def clear(self):
+        """Remove every cached entry"""
+        for path in self._scan():
+            self._remove(path)
+
+class ArticleCache(DiskCache):
+    """Extracted and analysed articles, keyed by normalized URL and company"""
+
+    def __init__(self, cache_dir=ARTICLE_CACHE_DIR, ttl=ARTICLE_TTL, max_entries=ARTICLE_MAX_ENTRIES):
+        super().__init__(cache_dir, ttl, max_entries)
+
+    def _raw_key(self, url, company_name):
+        # Summaries and topics depend on the company too
+        return f"{normalize_url(url)}|{company_name.lower()}"
+
+    def lookup(self, url, company_name):
+        """Return the stored entry (with 'article' and 'validators'), fresh or expired"""
+        return self.get_entry(self._raw_key(url, company_name))
+
+    def get(self, url, company_name):
+        """Return the cached article dict, or None on a miss or expired entry"""
+        entry = self.lookup(url, company_name)
+        if entry is None or not self.is_fresh(entry):
+            return None
+        return entry['article']
+
+    def put(self, url, company_name, article, validators=None):
+        """Store an article dict with the HTTP validators of its page"""
+        self.put_entry(self._raw_key(url, company_name), {
+            'url': normalize_url(url),
+            'company': company_name,
+            'validators': validators or {},
+            'article': article,
+        })
+
+class PageCache(DiskCache):
+    """Links parsed from search result pages, keyed by normalized URL"""
+
+    def __init__(self, cache_dir=PAGE_CACHE_DIR, ttl=PAGE_TTL, max_entries=PAGE_MAX_ENTRIES):
+        super().__init__(cache_dir, ttl, max_entries)
+
+    def lookup(self, url):
+        """Return the stored entry (with 'links' and 'validators'), fresh or expired"""
+        return self.get_entry(normalize_url(url))
+
+    def put(self, url, links, validators=None):
+        """Store the links parsed from a search page with its HTTP validators"""
+        self.put_entry(normalize_url(url), {
+            'url': normalize_url(url),
+            'validators': validators or {},
+            'links': links,
+        })
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def _shared(cache_class):
+    with _caches_lock:
+        if cache_class not in _caches:
+            _caches[cache_class] = cache_class()
+        return _caches[cache_class]
+
+def get_article_cache():
+    """Return the process-wide article cache"""
+    return _shared(ArticleCache)
+
+def get_page_cache():
+    """Return the process-wide search page cache"""
+    return _shared(PageCache)
+
+def cache_stats():
+    """Per-domain hit, miss and revalidation counts across both caches"""
+    return stats.snapshot()
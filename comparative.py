@@ -0,0 +1,134 @@
+import heapq
+from bisect import bisect_left, bisect_right
+
+import resources
+
+np = resources.LazyModule("numpy")
+
+# Weights of the two divergence components; both components lie in [0, 1]
+SENTIMENT_WEIGHT = 0.5
+TOPIC_WEIGHT = 0.5
+BLOCK_PAIRS = 65536   # Candidate pairs scored per float32 block
+BOUND_SLACK = 1e-6    # Margin for float32 rounding when pruning by the divergence bound
+
+class PairRanker:
+    """The k most divergent article pairs, updated one article at a time
+
+    Divergence mixes the sentiment score gap with the Jaccard distance of
+    the topic sets. Only pairs that yield a coverage difference are
+    considered: different sentiment labels, or each article having topics
+    the other lacks. Ties keep the earlier pair.
+
+    A pair's Jaccard distance is at most 1, so its divergence is at most
+    SENTIMENT_WEIGHT * gap / 2 + TOPIC_WEIGHT. Once k pairs are kept, a new
+    article is only scored against earlier articles whose score gap could
+    still beat the weakest kept pair, found by bisecting the sorted scores.
+    With spread-out scores that is a handful of articles, so adding n
+    articles costs about O(n log n), plus a short memmove per sorted insert.
+    When the scores are bunched together the bound prunes nothing and every
+    new article is scored against all earlier ones, O(n^2) overall, in
+    float32 blocks of BLOCK_PAIRS pairs.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []  # min-heap of (divergence, -i, -j): the weakest kept pair is on top
+        self._topics = []
+        self._postings = {}  # topic -> ids of the articles mentioning it
+        self._label_codes = {}
+        self._sorted_scores = []
+        self._sorted_ids = []
+        self._scores = np.zeros(64, dtype=np.float32)
+        self._labels = np.zeros(64, dtype=np.int32)
+        self._sizes = np.zeros(64, dtype=np.float32)
+
+    def __len__(self):
+        return len(self._topics)
+
+    def _partners(self, score):
+        """Ids of the earlier articles that could form a kept pair with a new article"""
+        if len(self.heap) < self.k or SENTIMENT_WEIGHT <= 0:
+            return self._sorted_ids
+        min_gap = 2.0 * (self.heap[0][0] - TOPIC_WEIGHT - BOUND_SLACK) / SENTIMENT_WEIGHT
+        if min_gap <= 0:
+            return self._sorted_ids
+        low = bisect_right(self._sorted_scores, score - min_gap)
+        high = bisect_left(self._sorted_scores, score + min_gap)
+        return self._sorted_ids[:low] + self._sorted_ids[high:]
+
+    def _shared(self, topics, partners):
+        """Number of topics each partner shares with a new article"""
+        posting_total = sum(len(self._postings.get(topic, ())) for topic in topics)
+        if posting_total < 4 * len(partners):
+            # Cheaper to count through the inverted index for every earlier article
+            shared = np.zeros(len(self._topics), dtype=np.float32)
+            for topic in topics:
+                if topic in self._postings:
+                    shared[np.array(self._postings[topic])] += 1
+            return shared[partners]
+        return np.array([len(topics & self._topics[j]) for j in partners], dtype=np.float32)
+
+    def _score(self, index, score, label, topics, partners):
+        partners = np.array(partners, dtype=np.int64)
+        shared = self._shared(topics, partners)
+        size = np.float32(len(topics))
+        sizes = self._sizes[partners]
+        union = sizes + size - shared
+        jaccard_distance = np.float32(1.0) - np.divide(shared, union, out=np.ones_like(shared), where=union > 0)
+        sentiment_gap = np.abs(self._scores[partners] - np.float32(score)) / np.float32(2.0)
+        divergence = np.float32(SENTIMENT_WEIGHT) * sentiment_gap + np.float32(TOPIC_WEIGHT) * jaccard_distance
+
+        keep = (self._labels[partners] != label) | ((shared < sizes) & (shared < size))
+        if len(self.heap) >= self.k:
+            # Only pairs that beat the weakest kept pair, ties going to the earlier pair
+            weakest, neg_i, neg_j = self.heap[0]
+            keep &= (divergence > weakest) | ((divergence == weakest) & (
+                (partners < -neg_i) | ((partners == -neg_i) & (index < -neg_j))))
+        partners, divergence = partners[keep], divergence[keep]
+        best = np.lexsort((partners, -divergence))[:self.k]
+        for j, value in zip(partners[best].tolist(), divergence[best].tolist()):
+            item = (value, -j, -index)
+            if len(self.heap) < self.k:
+                heapq.heappush(self.heap, item)
+            elif item > self.heap[0]:
+                heapq.heapreplace(self.heap, item)
+
+    def add(self, article):
+        """Pair a new article with the earlier ones; returns its index"""
+        index = len(self._topics)
+        score = float(article['sentiment']['score'])
+        label = self._label_codes.setdefault(article['sentiment']['label'], len(self._label_codes))
+        topics = set(article['topics'])
+
+        if self.k > 0 and index:
+            partners = self._partners(score)
+            for start in range(0, len(partners), BLOCK_PAIRS):
+                self._score(index, score, label, topics, partners[start:start + BLOCK_PAIRS])
+
+        if index == len(self._scores):
+            self._scores = np.concatenate([self._scores, np.zeros_like(self._scores)])
+            self._labels = np.concatenate([self._labels, np.zeros_like(self._labels)])
+            self._sizes = np.concatenate([self._sizes, np.zeros_like(self._sizes)])
+        self._scores[index] = score
+        self._labels[index] = label
+        self._sizes[index] = len(topics)
+        self._topics.append(topics)
+        for topic in topics:
+            self._postings.setdefault(topic, []).append(index)
+        position = bisect_right(self._sorted_scores, score)
+        self._sorted_scores.insert(position, score)
+        self._sorted_ids.insert(position, index)
+        return index
+
+    def ranked(self):
+        """Kept pairs (i < j), most divergent first"""
+        return [(-neg_i, -neg_j) for _, neg_i, neg_j in sorted(self.heap, reverse=True)]
+
+def rank_pairs(articles, k):
+    """The k most divergent article pairs (i < j), most divergent first; see PairRanker"""
+    if len(articles) < 2 or k <= 0:
+        return []
+    ranker = PairRanker(k)
+    for article in articles:
+        ranker.add(article)
+    return ranker.ranked()
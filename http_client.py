@@ -0,0 +1,249 @@
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Connection pool and retry settings
+POOL_MAXSIZE = 10          # Keep-alive connections kept per host
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5       # Sleeps 0.5s, 1s, 2s between retries
+BACKOFF_MAX = 5            # Longest sleep between two attempts
+MAX_RETRY_AFTER = 10       # A longer Retry-After is not waited for: the response is returned as is
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+
+# Politeness settings
+PER_HOST_CONCURRENCY = 4   # Concurrent requests allowed against one host
+PER_HOST_DELAY = 0.1       # Minimum seconds between request starts on one host (at most 10/s)
+
+def host_of(url):
+    """Return the host[:port] part of a url"""
+    return urlparse(url).netloc
+
+def validators_from(response, previous=None):
+    """ETag / Last-Modified validators of a response, falling back to previous ones"""
+    validators = dict(previous or {})
+    if response.headers.get('ETag'):
+        validators['etag'] = response.headers['ETag']
+    if response.headers.get('Last-Modified'):
+        validators['last_modified'] = response.headers['Last-Modified']
+    return validators
+
+def retry_after(response):
+    """Seconds a response's Retry-After header asks to wait, or None without a valid one"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+def conditional_headers(validators):
+    """Request headers that make the server answer 304 if the page is unchanged"""
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+class HostThrottle:
+    """Per-host politeness limits: a concurrency cap and a minimum spacing between requests"""
+
+    def __init__(self, max_per_host=PER_HOST_CONCURRENCY, min_interval=PER_HOST_DELAY):
+        self.max_per_host = max_per_host
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+
+    @contextmanager
+    def slot(self, url):
+        """Block until a request to the url's host may start"""
+        host = host_of(url)
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._semaphores[host] = semaphore
+        semaphore.acquire()
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+        finally:
+            semaphore.release()
+
+class HttpClient:
+    """Keep-alive HTTP client with one pooled session per host
+    
+    Connection errors, timeouts and RETRY_STATUSES responses are retried up
+    to max_retries times with capped exponential backoff, or after the
+    server's Retry-After when it is at most max_retry_after. The wait
+    happens outside the host's throttle slot, so other requests to the
+    host are not held up by it.
+    """
+
+    def __init__(self, pool_maxsize=POOL_MAXSIZE, max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR,
+                 connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, throttle=None,
+                 backoff_max=BACKOFF_MAX, max_retry_after=MAX_RETRY_AFTER):
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.timeout = (connect_timeout, read_timeout)
+        self.throttle = throttle if throttle is not None else HostThrottle()
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def session_for(self, url):
+        """Return the shared session for the url's host, creating it on first use"""
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        host = host_of(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(HEADERS)
+                # Retries are done by get(), outside the throttle slot
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, pool_block=True)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+            return session
+
+    def get(self, url, timeout=None, validators=None, **kwargs):
+        """GET a url through the host's pooled session, respecting the politeness limits
+        
+        Passing the validators stored with a cached copy makes the request
+        conditional, so an unchanged page comes back as an empty 304.
+        """
+        import requests
+        
+        session = self.session_for(url)
+        if validators:
+            kwargs['headers'] = {**conditional_headers(validators), **kwargs.get('headers', {})}
+        attempt = 0
+        while True:
+            with self.throttle.slot(url):
+                try:
+                    response, error = session.get(url, timeout=timeout or self.timeout, **kwargs), None
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    response, error = None, e
+            delay = self._retry_delay(url, response, attempt)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            if response is not None:
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+    def _retry_delay(self, url, response, attempt):
+        """Seconds to wait before retrying a failed attempt, or None to give up"""
+        if attempt >= self.max_retries:
+            return None
+        if response is not None and response.status_code not in RETRY_STATUSES:
+            return None
+        if response is not None:
+            wait = retry_after(response)
+            if wait is not None:
+                if wait > self.max_retry_after:
+                    logger.warning(f"{host_of(url)} asked to retry after {wait:.0f}s, giving up on {url}")
+                    return None
+                return wait
+        return min(self.backoff_factor * 2 ** attempt, self.backoff_max)
+
+    def connection_stats(self):
+        """Per-host request, new-connection and connection-reuse counts"""
+        stats = {}
+        with self._lock:
+            sessions = list(self._sessions.items())
+        for host, session in sessions:
+            requests_made = connections = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is not None:
+                        requests_made += pool.num_requests
+                        connections += pool.num_connections
+            stats[host] = {
+                'requests': requests_made,
+                'connections': connections,
+                'reused': max(requests_made - connections, 0),
+            }
+        return stats
+
+    def close(self):
+        """Close every pooled session"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Return the process-wide HTTP client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+def configure(**kwargs):
+    """Replace the process-wide HTTP client with one built from kwargs"""
+    global _client
+    with _client_lock:
+        old, _client = _client, HttpClient(**kwargs)
+    if old is not None:
+        old.close()
+    return _client
+
+def reset():
+    """Forget the process-wide HTTP client without closing it
+    
+    For forked child processes: the inherited connections belong to the
+    parent, so the child must open its own.
+    """
+    global _client
+    with _client_lock:
+        _client = None
+
+def get(url, **kwargs):
+    """GET a url with the process-wide HTTP client"""
+    return get_client().get(url, **kwargs)
+
+def connection_stats():
+    """Per-host connection-reuse counters of the process-wide HTTP client"""
+    return get_client().connection_stats()
@@ -0,0 +1,186 @@
+import os
+import io
+import time
+import json
+import bisect
+import pstats
+import cProfile
+import logging
+import functools
+import threading
+import contextlib
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.environ.get("NEWS_METRICS", "1") != "0"
+METRIC_PREFIX = "news"
+SPAN_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+PROFILE_ENGINES = ("cprofile", "pyinstrument")
+PROFILE_EXTENSIONS = {"cprofile": "prof", "pyinstrument": "html"}  # Report file type written by each engine
+
+class Registry:
+    """Per-stage timing histograms and event counters, safe to update from any thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.spans = {}  # stage -> [bucket counts, total seconds, count]
+            self.counters = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            span = self.spans.get(stage)
+            if span is None:
+                span = self.spans[stage] = [[0] * len(SPAN_BUCKETS), 0.0, 0]
+            span[0][bisect.bisect_left(SPAN_BUCKETS, seconds)] += 1
+            span[1] += seconds
+            span[2] += 1
+
+    def incr(self, event, amount=1):
+        with self._lock:
+            self.counters[event] = self.counters.get(event, 0) + amount
+
+    def snapshot(self):
+        """Stage timings (with cumulative histograms keyed by bucket label) and counters"""
+        with self._lock:
+            stages = {}
+            for stage, (counts, total, count) in sorted(self.spans.items()):
+                cumulative, buckets = 0, {}
+                for bound, bucket_count in zip(SPAN_BUCKETS, counts):
+                    cumulative += bucket_count
+                    buckets[_bucket_label(bound)] = cumulative
+                stages[stage] = {'count': count, 'sum': total, 'mean': total / count, 'buckets': buckets}
+            return {'stages': stages, 'counters': dict(sorted(self.counters.items()))}
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+registry = Registry()
+_enabled = METRICS_ENABLED
+_NOOP = contextlib.nullcontext()
+
+def _bucket_label(bound):
+    return "+Inf" if bound == float('inf') else repr(bound)
+
+def enable(flag=True):
+    """Switch recording on or off for the whole process"""
+    global _enabled
+    _enabled = flag
+
+def is_enabled():
+    return _enabled
+
+def span(stage):
+    """Context manager timing one pipeline stage; a shared no-op when metrics are disabled"""
+    return _Span(stage) if _enabled else _NOOP
+
+def timed(stage):
+    """Decorator timing every call of a function as a pipeline stage"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def incr(event, amount=1):
+    """Count an event such as a fallback being taken"""
+    if _enabled:
+        registry.incr(event, amount)
+
+def snapshot():
+    return registry.snapshot()
+
+def reset():
+    registry.reset()
+
+def to_json(**kwargs):
+    return json.dumps(registry.snapshot(), **kwargs)
+
+def to_prometheus():
+    """Stage histograms and event counters in the Prometheus text exposition format"""
+    data = registry.snapshot()
+    lines = [
+        f"# HELP {METRIC_PREFIX}_stage_seconds Time spent in each pipeline stage",
+        f"# TYPE {METRIC_PREFIX}_stage_seconds histogram",
+    ]
+    for stage, timing in data['stages'].items():
+        for label, count in timing['buckets'].items():
+            lines.append(f'{METRIC_PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{label}"}} {count}')
+        lines.append(f'{METRIC_PREFIX}_stage_seconds_sum{{stage="{stage}"}} {timing["sum"]}')
+        lines.append(f'{METRIC_PREFIX}_stage_seconds_count{{stage="{stage}"}} {timing["count"]}')
+    lines.extend([
+        f"# HELP {METRIC_PREFIX}_events_total Fallbacks and other pipeline events",
+        f"# TYPE {METRIC_PREFIX}_events_total counter",
+    ])
+    for event, count in data['counters'].items():
+        lines.append(f'{METRIC_PREFIX}_events_total{{event="{event}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+def profile_engine(engine):
+    """The engine capture() will use for engine: cprofile when pyinstrument is not installed"""
+    if engine not in PROFILE_ENGINES:
+        raise ValueError(f"Unknown profile engine {engine!r}, expected one of {PROFILE_ENGINES}")
+    if engine == "pyinstrument":
+        try:
+            __import__("pyinstrument")
+        except ImportError:
+            logger.warning("pyinstrument is not installed, profiling with cProfile instead")
+            return "cprofile"
+    return engine
+
+@contextlib.contextmanager
+def capture(path=None, engine="cprofile"):
+    """Profile the enclosed block
+
+    cprofile writes a .prof file for pstats/snakeviz; pyinstrument (if
+    installed) writes an HTML report. Resolve the engine with profile_engine()
+    first to pick the matching extension (PROFILE_EXTENSIONS) for path.
+    Without a path the top of the profile is logged instead.
+    """
+    engine = profile_engine(engine)
+
+    if engine == "pyinstrument":
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            if path:
+                with open(path, 'w', encoding='utf-8') as report:
+                    report.write(profiler.output_html())
+            else:
+                logger.info(profiler.output_text())
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+        else:
+            report = io.StringIO()
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(20)
+            logger.info(report.getvalue())
@@ -0,0 +1,192 @@
+import re
+import time
+import logging
+import threading
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+# Parser backends in order of preference; the first one installed is used
+PARSER_BACKENDS = ("lxml", "html.parser")
+
+# Parse only the parts of article pages that extraction reads
+TARGETED_PARSING = True
+
+# Tags and container classes read by article extraction. Kept containers are
+# parsed with their whole subtree, so "div.artText p" style selectors still work.
+# Registering an extraction profile adds the tags and classes its selectors use.
+ARTICLE_TAGS = {'h1', 'p', 'meta', 'time', 'article'}
+ARTICLE_CLASSES = set()
+
+_SELECTOR_CLASS = re.compile(r'\.([\w-]+)')
+# Tags qualified by a class are already kept through ARTICLE_CLASSES
+_SELECTOR_TAG = re.compile(r'(?:^|[\s>+~,])([a-z][a-z0-9]*)(?![\w.-])')
+
+def _available(backend):
+    if backend == "html.parser":
+        return True
+    try:
+        __import__(backend)
+        return True
+    except ImportError:
+        return False
+
+def available_backends():
+    """Installed parser backends, fastest first"""
+    return [backend for backend in PARSER_BACKENDS if _available(backend)]
+
+_default_backend = None
+
+def default_backend():
+    """The fastest installed parser backend"""
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = available_backends()[0]
+        logger.info(f"Using HTML parser backend: {_default_backend}")
+    return _default_backend
+
+def _is_article_tag(name, attrs=None):
+    if name in ARTICLE_TAGS:
+        return True
+    classes = (attrs or {}).get('class') or ''
+    if not isinstance(classes, str):
+        classes = ' '.join(classes)
+    return not ARTICLE_CLASSES.isdisjoint(classes.split())
+
+class ArticleStrainer(SoupStrainer):
+    """Keeps only the tags and containers article extraction looks at"""
+
+    def __init__(self):
+        # Older bs4 calls the name function with (name, attrs) while parsing
+        super().__init__(name=_is_article_tag)
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        # bs4 >= 4.13 decides tag creation here
+        return _is_article_tag(name, attrs)
+
+def make_soup(html, backend=None, targeted=False):
+    """Parse html with the given (or fastest) backend, optionally keeping only article subtrees"""
+    parse_only = ArticleStrainer() if targeted else None
+    return BeautifulSoup(html, backend or default_backend(), parse_only=parse_only)
+
+class ExtractionProfile:
+    """Precompiled title, content and date selectors for one site
+    
+    Each field's selectors are tried in order and the first match wins.
+    """
+
+    def __init__(self, name, hosts, title, content, date):
+        self.name = name
+        self.hosts = tuple(hosts)
+        self.selectors = list(title) + list(content) + list(date)
+        self.title = [soupsieve.compile(selector) for selector in title]
+        self.content = [soupsieve.compile(selector) for selector in content]
+        self.date = [soupsieve.compile(selector) for selector in date]
+
+    def find_title(self, soup):
+        for selector in self.title:
+            element = selector.select_one(soup)
+            if element:
+                return element.get_text().strip()
+        return None
+
+    def find_content(self, soup):
+        for selector in self.content:
+            elements = selector.select(soup)
+            if elements:
+                return ' '.join([p.get_text().strip() for p in elements])
+        return ""
+
+    def find_date(self, soup):
+        for selector in self.date:
+            element = selector.select_one(soup)
+            if element:
+                if element.get('content'):
+                    return element.get('content')
+                return element.get_text().strip()
+        return None
+
+# Used for unknown domains and for fields a site profile misses
+GENERIC_PROFILE = ExtractionProfile(
+    'generic', (),
+    title=['h1', 'div.artTitle h1', 'div.headline', '.article-title', '.story-headline'],
+    content=['div.artText p', 'div.story-content p', 'article p', '.article-content p'],
+    date=['meta[property="article:published_time"]', 'meta[name="publish-date"]', '.date', '.article-date', 'time'],
+)
+
+_profiles_by_host = {}
+
+def register_profile(profile):
+    """Add a site profile and make targeted parsing keep what its selectors read"""
+    for host in profile.hosts:
+        _profiles_by_host[host] = profile
+    for selector in profile.selectors:
+        ARTICLE_CLASSES.update(_SELECTOR_CLASS.findall(selector))
+        ARTICLE_TAGS.update(_SELECTOR_TAG.findall(selector))
+    return profile
+
+def profile_for(url):
+    """The site profile for a url's host (or a parent domain), else the generic profile"""
+    host = urlparse(url).netloc.lower().split(':')[0] if url else ''
+    while host:
+        profile = _profiles_by_host.get(host)
+        if profile is not None:
+            return profile
+        host = host.partition('.')[2]
+    return GENERIC_PROFILE
+
+register_profile(GENERIC_PROFILE)
+
+register_profile(ExtractionProfile(
+    'economictimes', ['economictimes.indiatimes.com'],
+    title=['h1.artTitle', 'div.artTitle h1', 'h1'],
+    content=['div.artText p'],
+    date=['meta[property="article:published_time"]', 'time'],
+))
+
+register_profile(ExtractionProfile(
+    'business-standard', ['business-standard.com'],
+    title=['h1.stryhdtp', 'h1'],
+    content=['div.story-content p', '.storycontent p'],
+    date=['meta[property="article:published_time"]', 'meta[name="publish-date"]'],
+))
+
+class ProfileStats:
+    """Per-profile counts of pages, profile hits and slower fallback paths"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: {'pages': 0, 'hits': 0, 'generic_fallbacks': 0, 'paragraph_scans': 0})
+
+    def record(self, profile, outcome):
+        """Count one outcome: 'pages', 'hits', 'generic_fallbacks' or 'paragraph_scans'"""
+        with self._lock:
+            self._counts[profile.name][outcome] += 1
+
+    def snapshot(self):
+        """Counts per profile name, with the hit rate of each"""
+        with self._lock:
+            result = {name: dict(counts) for name, counts in self._counts.items()}
+        for counts in result.values():
+            counts['hit_rate'] = counts['hits'] / counts['pages'] if counts['pages'] else 0.0
+        return result
+
+profile_stats = ProfileStats()
+
+def benchmark_backends(pages, repeat=3):
+    """Pages parsed per second for every installed backend, full and targeted"""
+    results = {}
+    for backend in available_backends():
+        for targeted in (False, True):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for html in pages:
+                    make_soup(html, backend, targeted)
+            elapsed = time.perf_counter() - start
+            label = f"{backend}{' (targeted)' if targeted else ''}"
+            results[label] = (len(pages) * repeat) / elapsed if elapsed else float('inf')
+    return results
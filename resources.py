@@ -0,0 +1,238 @@
+import os
+import re
+import sys
+import logging
+import argparse
+import importlib
+import statistics
+import threading
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+# Local NLTK data directory, searched before NLTK's defaults; filled by the preflight
+NLTK_DATA_DIR = os.environ.get("NEWS_NLTK_DATA", os.path.join(os.path.dirname(os.path.abspath(__file__)), "nltk_data"))
+# Missing resources are an error unless NEWS_NLTK_DOWNLOAD=1 allows downloading them on first use;
+# `python resources.py preflight` is the normal way to install them
+NLTK_AUTO_DOWNLOAD = os.environ.get("NEWS_NLTK_DOWNLOAD", "0") == "1"
+NLTK_DOWNLOAD_TIMEOUT = 30  # Seconds a first use waits for an allowed download (nltk.download has no network timeout)
+NLTK_RESOURCES = {
+    'punkt_tab': 'tokenizers/punkt_tab',  # Sentence tokenizer model of nltk >= 3.8.2
+    'punkt': 'tokenizers/punkt',          # Sentence tokenizer model of older nltk
+    'stopwords': 'corpora/stopwords',
+}
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+_lock = threading.RLock()
+_nltk = None
+_ready = set()
+_missing = {}
+_downloads = {}  # name -> thread downloading it
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access
+    
+    For heavy dependencies only used inside functions (numpy takes ~80 ms to
+    import). Once loaded, the module's attributes are copied onto the proxy,
+    so later lookups cost the same as on the module itself.
+    """
+
+    def __init__(self, name):
+        self.__name = name
+        self.__module = None
+
+    def __getattr__(self, attr):
+        # Only called for attributes not copied yet
+        module = self.__module
+        if module is None:
+            with _lock:
+                module = self.__module
+                if module is None:
+                    module = importlib.import_module(self.__name)
+                    self.__dict__.update(module.__dict__)
+                    self.__module = module
+        # Submodules such as numpy.random may only load on access
+        value = getattr(module, attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self):
+        return f"<lazy module {self.__name!r}>"
+
+def nltk_module():
+    """Import nltk on first use, with NLTK_DATA_DIR on its data path
+
+    Importing nltk takes over a second (it pulls in scipy.stats), so it is
+    deferred until a tokenizer or corpus is actually needed.
+    """
+    global _nltk
+    if _nltk is None:
+        with _lock:
+            if _nltk is None:
+                import nltk
+                if NLTK_DATA_DIR not in nltk.data.path:
+                    nltk.data.path.insert(0, NLTK_DATA_DIR)
+                _nltk = nltk
+    return _nltk
+
+def ensure(name):
+    """Make an NLTK resource available, raising LookupError if it is not installed
+
+    With NLTK_AUTO_DOWNLOAD a missing resource is downloaded into
+    NLTK_DATA_DIR on a background thread; callers wait at most
+    NLTK_DOWNLOAD_TIMEOUT for it, without holding the module lock. A missing
+    resource is reported once and not looked up or fetched again.
+    """
+    if name in _ready:
+        return
+    nltk = nltk_module()
+    with _lock:
+        if name in _ready:
+            return
+        if name in _missing:
+            raise LookupError(_missing[name])
+        if _installed(nltk, name):
+            _ready.add(name)
+            return
+        if not NLTK_AUTO_DOWNLOAD:
+            raise LookupError(_mark_missing(name, "is not installed"))
+        download = _downloads.get(name)
+        if download is None:
+            download = threading.Thread(target=_download, args=(nltk, name, NLTK_DATA_DIR), name=f"nltk-download-{name}", daemon=True)
+            _downloads[name] = download
+            download.start()
+    
+    download.join(NLTK_DOWNLOAD_TIMEOUT)
+    with _lock:
+        if name in _ready:
+            return
+        if name in _missing:
+            raise LookupError(_missing[name])
+        if download.is_alive():
+            raise LookupError(_mark_missing(name, f"was not downloaded within {NLTK_DOWNLOAD_TIMEOUT}s"))
+        if not _installed(nltk, name):
+            raise LookupError(_mark_missing(name, "could not be downloaded"))
+        _ready.add(name)
+
+def _mark_missing(name, reason):
+    # Called with _lock held
+    _missing[name] = f"NLTK resource {name!r} {reason}; run `python resources.py preflight` to vendor it into {NLTK_DATA_DIR}"
+    logger.error(_missing[name])
+    return _missing[name]
+
+def _download(nltk, name, data_dir, quiet=True):
+    logger.info(f"Downloading NLTK resource {name} into {data_dir}")
+    try:
+        return bool(nltk.download(name, download_dir=data_dir, quiet=quiet, raise_on_error=True))
+    except Exception as e:
+        logger.error(f"Error downloading NLTK resource {name}: {e}")
+        return False
+
+def sentence_resource():
+    """Name of the punkt model the installed nltk's sent_tokenize loads"""
+    return 'punkt_tab' if hasattr(nltk_module().tokenize, 'PunktTokenizer') else 'punkt'
+
+def sent_tokenize(text):
+    """nltk's sent_tokenize, importing nltk and loading punkt on first use"""
+    ensure(sentence_resource())
+    return _nltk.tokenize.sent_tokenize(text)
+
+def stopwords(lang='english'):
+    """nltk's stopword list for a language, importing nltk and loading the corpus on first use"""
+    ensure('stopwords')
+    return _nltk.corpus.stopwords.words(lang)
+
+def preflight(data_dir=NLTK_DATA_DIR, names=tuple(NLTK_RESOURCES)):
+    """Download every NLTK resource the pipeline uses into data_dir
+
+    Run once with network access (e.g. while building an image); afterwards
+    the app loads everything from data_dir and never touches the network.
+    Returns {name: installed}.
+    """
+    nltk = nltk_module()
+    os.makedirs(data_dir, exist_ok=True)
+    status = {}
+    for name in names:
+        if not _installed(nltk, name, data_dir):
+            _download(nltk, name, data_dir, quiet=False)
+        status[name] = _installed(nltk, name, data_dir)
+    return status
+
+def check(data_dir=NLTK_DATA_DIR, names=tuple(NLTK_RESOURCES)):
+    """Report which resources are present in data_dir, without any network access"""
+    nltk = nltk_module()
+    return {name: _installed(nltk, name, data_dir) for name in names}
+
+def _installed(nltk, name, data_dir=None):
+    """True if the resource is in data_dir, or anywhere on nltk's data path if data_dir is None"""
+    try:
+        nltk.data.find(NLTK_RESOURCES[name], paths=[data_dir] if data_dir else None)
+        return True
+    except LookupError:
+        return False
+
+def benchmark_import(module="api", repeat=5, top=10):
+    """Time `import module` in fresh interpreters with `python -X importtime`
+
+    Returns the best and median total import time in milliseconds plus the
+    heaviest imports (cumulative milliseconds) of the fastest run.
+    """
+    totals = []
+    best_run = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, env={**os.environ, "NEWS_NLTK_DOWNLOAD": "0"}
+        )
+        rows = []
+        total = None
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            cumulative, depth, name = int(match.group(2)), len(match.group(3)), match.group(4)
+            rows.append((cumulative, depth, name))
+            if name == module and depth == 0:
+                total = cumulative
+        if total is None:
+            raise RuntimeError(f"Could not import {module}: {result.stderr.strip()[-500:]}")
+        totals.append(total)
+        if best_run is None or total < best_run[0]:
+            best_run = (total, rows)
+    heaviest = sorted((row for row in best_run[1] if row[2] != module), reverse=True)[:top]
+    return {
+        'module': module,
+        'best_ms': min(totals) / 1000,
+        'median_ms': statistics.median(totals) / 1000,
+        'heaviest': [(name, cumulative / 1000) for cumulative, _, name in heaviest],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the NLTK data used by the pipeline and measure import time")
+    commands = parser.add_subparsers(dest="command", required=True)
+    preflight_parser = commands.add_parser("preflight", help="Download the NLTK resources into the local data dir")
+    preflight_parser.add_argument("--data-dir", default=NLTK_DATA_DIR)
+    check_parser = commands.add_parser("check", help="Verify offline that the NLTK resources are present")
+    check_parser.add_argument("--data-dir", default=NLTK_DATA_DIR)
+    importtime_parser = commands.add_parser("importtime", help="Benchmark the import time of a module")
+    importtime_parser.add_argument("module", nargs="?", default="api")
+    importtime_parser.add_argument("-n", "--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == "importtime":
+        result = benchmark_import(args.module, args.repeat)
+        print(f"import {result['module']}: best {result['best_ms']:.1f} ms, median {result['median_ms']:.1f} ms")
+        for name, milliseconds in result['heaviest']:
+            print(f"  {milliseconds:8.1f} ms  {name}")
+        return 0
+
+    status = preflight(args.data_dir) if args.command == "preflight" else check(args.data_dir)
+    for name, installed in status.items():
+        print(f"{name:<10} {'ok' if installed else 'MISSING'}  ({args.data_dir})")
+    # punkt_tab and punkt are alternatives depending on the nltk version
+    required = [sentence_resource(), 'stopwords']
+    return 0 if all(status[name] for name in required) else 1
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
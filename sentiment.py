@@ -0,0 +1,148 @@
+import time
+import threading
+
+import resources
+
+np = resources.LazyModule("numpy")
+
+# Label thresholds on polarity, shared with analyze_sentiment
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+class CompiledLexicon:
+    """TextBlob's pattern sentiment lexicon flattened for fast batch scoring
+    
+    Scores follow pattern's assessment rules exactly (modifiers, negations,
+    exclamation marks, sarcasm marks and emoticons), so polarities match
+    TextBlob(text).sentiment.polarity.
+    """
+
+    def __init__(self):
+        from textblob.en import sentiment as pattern_sentiment, parser
+        from textblob._text import EMOTICONS, PUNCTUATION
+
+        pattern_sentiment.load()
+        # word -> (polarity, subjectivity, intensity, is_modifier); pattern only
+        # assesses words that have an untagged (None) entry
+        self.words = {}
+        for word, by_pos in dict.items(pattern_sentiment):
+            if None in by_pos:
+                p, s, i = by_pos[None]
+                is_modifier = any(pos in by_pos for pos in pattern_sentiment.modifiers)
+                self.words[word] = (p, s, i, is_modifier)
+        self.negations = frozenset(pattern_sentiment.negations)
+        self.punctuation = frozenset(PUNCTUATION)
+        self.emoticons = {}
+        for (_, polarity), faces in EMOTICONS.items():
+            for face in faces:
+                self.emoticons.setdefault(face.lower(), polarity)
+        self._find_tokens = parser.find_tokens
+
+    def tokenize(self, text):
+        """Lowercased tokens, split exactly as pattern does"""
+        return " ".join(self._find_tokens(text)).lower().split()
+
+    def assess(self, tokens):
+        """Polarity of each assessed chunk of a token list"""
+        words = self.words
+        negations = self.negations
+        a = []        # [polarity, subjectivity, intensity, negated]
+        m = None      # Preceding modifier
+        n = None      # Preceding negation
+        for w in tokens:
+            entry = words.get(w)
+            if entry is not None:
+                p, s, i, is_modifier = entry
+                if m is None:
+                    a.append([p, s, i, False])
+                else:
+                    last = a[-1]
+                    last[0] = max(-1.0, min(p * last[2], +1.0))
+                    last[1] = max(-1.0, min(s * last[2], +1.0))
+                    last[2] = i
+                if n is not None:
+                    a[-1][2] = 1.0 / a[-1][2]
+                    a[-1][3] = True
+                m = w if is_modifier else None
+                n = w if w in negations else None
+            else:
+                if w in negations:
+                    n = w
+                elif n and len(w.strip("'")) > 1:
+                    n = None
+                if n is not None and m is not None and m.endswith("ly"):
+                    a[-1][3] = True
+                    n = None
+                elif m and len(w) > 2:
+                    m = None
+                if w == "!" and a:
+                    a[-1][0] = max(-1.0, min(a[-1][0] * 1.25, +1.0))
+                if w == "(!)":
+                    a.append([0.0, 1.0, 1.0, False])
+                if w.isalpha() is False and len(w) <= 5 and w not in self.punctuation:
+                    polarity = self.emoticons.get(w)
+                    if polarity is not None:
+                        a.append([polarity, 1.0, 1.0, False])
+        # "not good" = slightly bad, "not bad" = slightly good
+        return [p * -0.5 if negated else p for p, _, _, negated in a]
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+def get_lexicon():
+    """The compiled lexicon, built on first use"""
+    global _lexicon
+    with _lexicon_lock:
+        if _lexicon is None:
+            _lexicon = CompiledLexicon()
+        return _lexicon
+
+def polarity_batch(token_lists):
+    """Polarity of every token list as a float64 array, averaged with one bincount"""
+    lexicon = get_lexicon()
+    values = []
+    doc_ids = []
+    for doc_id, tokens in enumerate(token_lists):
+        polarities = lexicon.assess(tokens)
+        values.extend(polarities)
+        doc_ids.extend([doc_id] * len(polarities))
+    
+    n_docs = len(token_lists)
+    doc_ids = np.asarray(doc_ids, dtype=np.intp)
+    sums = np.bincount(doc_ids, weights=np.asarray(values, dtype=np.float64), minlength=n_docs)
+    counts = np.bincount(doc_ids, minlength=n_docs)
+    return np.divide(sums, counts, out=np.zeros(n_docs), where=counts > 0)
+
+def label_scores(scores):
+    """Positive / Negative / Neutral labels for an array of polarities"""
+    return np.where(scores > POSITIVE_THRESHOLD, "Positive",
+                    np.where(scores < NEGATIVE_THRESHOLD, "Negative", "Neutral"))
+
+def analyze_batch(texts):
+    """Sentiment of many texts in one call, as [{'label', 'score'}, ...]"""
+    lexicon = get_lexicon()
+    return analyze_tokens_batch([lexicon.tokenize(text) for text in texts])
+
+def analyze_tokens_batch(token_lists):
+    """Sentiment of many already tokenized texts (see CompiledLexicon.tokenize)"""
+    scores = polarity_batch(token_lists)
+    labels = label_scores(scores)
+    return [{'label': str(label), 'score': float(score)} for label, score in zip(labels, scores)]
+
+def benchmark(texts, repeat=3):
+    """Documents per second for TextBlob and for the batch scorer"""
+    from textblob import TextBlob
+
+    get_lexicon()
+    results = {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            TextBlob(text).sentiment.polarity
+    results['textblob'] = len(texts) * repeat / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for _ in range(repeat):
+        analyze_batch(texts)
+    results['batch'] = len(texts) * repeat / (time.perf_counter() - start)
+    return results
@@ -0,0 +1,222 @@
+import sys
+import json
+import asyncio
+import logging
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+import api
+import tts
+import http_client
+import metrics
+from cache import cache_stats
+
+logger = logging.getLogger(__name__)
+
+# Pipeline runs in flight and waiting; requests beyond that are answered with 429
+ANALYSIS_WORKERS = 4
+ANALYSIS_QUEUE = 16
+ARTICLE_WORKERS = 8
+ARTICLE_QUEUE = 32
+AUDIO_WORKERS = 4
+AUDIO_QUEUE = 32
+MAX_ARTICLES = 20
+RETRY_AFTER = 5  # Seconds suggested to clients turned away with 429
+
+class Saturated(Exception):
+    """Raised when a pool has no free worker or queue slot left"""
+
+class BoundedPool:
+    """Thread pool with a fixed number of queue slots; submissions beyond them are rejected
+
+    Only used from the event loop thread, so the pending count needs no lock.
+    """
+
+    def __init__(self, name, workers, queue_size):
+        self.name = name
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.pending = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+
+    async def run(self, fn, *args):
+        if self.pending >= self.capacity:
+            self.rejected += 1
+            raise Saturated(self.name)
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    def snapshot(self):
+        return {'workers': self.workers, 'capacity': self.capacity, 'pending': self.pending, 'rejected': self.rejected}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+class Coalescer:
+    """Share one in-flight run between concurrent requests for the same key"""
+
+    def __init__(self):
+        self._inflight = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key, factory):
+        task = self._inflight.get(key)
+        if task is None:
+            self.started += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # A client going away must not cancel the run the other waiters share
+        return await asyncio.shield(task)
+
+    def snapshot(self):
+        return {'in_flight': len(self._inflight), 'started': self.started, 'coalesced': self.coalesced}
+
+analysis_pool = BoundedPool("analysis", ANALYSIS_WORKERS, ANALYSIS_QUEUE)
+article_pool = BoundedPool("article", ARTICLE_WORKERS, ARTICLE_QUEUE)
+audio_pool = BoundedPool("audio", AUDIO_WORKERS, AUDIO_QUEUE)
+coalescer = Coalescer()
+
+def audio_url(key):
+    return f"/audio/{key}"
+
+def run_pipeline(company_name, num_articles):
+    """Fetch, analyze and summarize the news for a company (runs on a worker thread)"""
+    articles = api.fetch_news(company_name, num_articles)
+    comparative_analysis = api.generate_comparative_analysis(articles)
+    overall_summary = api.generate_overall_summary(company_name, articles, comparative_analysis)
+
+    report = api.build_json_output(company_name, articles, comparative_analysis)
+    report["Overall Summary"] = overall_summary
+    # Audio is only synthesized when its URL is requested
+    report["Audio"] = audio_url(tts.register(api.translate_to_hindi(overall_summary), lang='hi'))
+    for entry, article in zip(report["Articles"], articles):
+        entry["URL"] = article['url']
+        entry["Audio"] = audio_url(api.article_audio_key(article))
+    return report
+
+def run_article(url, company_name):
+    """Analyze a single article (runs on a worker thread)"""
+    article = api.extract_article_data(url, company_name)
+    if article is None:
+        return None
+    return {**article, 'audio_url': audio_url(article['audio_key'])}
+
+def error_response(status, message):
+    return JSONResponse({'error': message}, status_code=status)
+
+def busy_response(error):
+    return JSONResponse(
+        {'error': f"Server busy ({error.args[0]} queue full), retry later"},
+        status_code=429,
+        headers={'Retry-After': str(RETRY_AFTER)}
+    )
+
+async def analyze_company(request):
+    company_name = request.query_params.get('company', '').strip()
+    if not company_name:
+        return error_response(400, "Missing 'company' parameter")
+    try:
+        num_articles = int(request.query_params.get('articles', 5))
+    except ValueError:
+        return error_response(400, "'articles' must be an integer")
+    if not 1 <= num_articles <= MAX_ARTICLES:
+        return error_response(400, f"'articles' must be between 1 and {MAX_ARTICLES}")
+
+    key = ('company', company_name.lower(), num_articles)
+    try:
+        report = await coalescer.run(key, lambda: analysis_pool.run(run_pipeline, company_name, num_articles))
+    except Saturated as e:
+        return busy_response(e)
+    return JSONResponse(report)
+
+async def analyze_article(request):
+    url = request.query_params.get('url', '').strip()
+    company_name = request.query_params.get('company', '').strip()
+    if not url or not company_name:
+        return error_response(400, "Missing 'url' or 'company' parameter")
+
+    key = ('article', url, company_name.lower())
+    try:
+        article = await coalescer.run(key, lambda: article_pool.run(run_article, url, company_name))
+    except Saturated as e:
+        return busy_response(e)
+    if article is None:
+        return error_response(502, f"Could not extract an article from {url}")
+    return JSONResponse(article)
+
+async def get_audio(request):
+    key = request.path_params['key']
+    try:
+        audio = await audio_pool.run(tts.get_audio, key)
+    except Saturated as e:
+        return busy_response(e)
+    if audio is None:
+        return error_response(404, f"No audio available for {key}")
+    return Response(audio, media_type=tts.get_backend().mime)
+
+def audio_stats():
+    """tts.audio_stats() with the histogram bounds as strings, since JSON has no infinity"""
+    stats = tts.audio_stats()
+    latency = stats['synthesis_latency']
+    latency['buckets'] = {("+Inf" if bound == float('inf') else str(bound)): count for bound, count in latency['buckets'].items()}
+    return stats
+
+async def get_stats(request):
+    return JSONResponse({
+        'pools': {pool.name: pool.snapshot() for pool in (analysis_pool, article_pool, audio_pool)},
+        'coalescing': coalescer.snapshot(),
+        'cache': cache_stats(),
+        'audio': audio_stats(),
+        'connections': http_client.connection_stats(),
+        'stages': metrics.snapshot(),
+    })
+
+async def get_metrics(request):
+    return PlainTextResponse(metrics.to_prometheus(), media_type="text/plain; version=0.0.4")
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    for pool in (analysis_pool, article_pool, audio_pool):
+        pool.shutdown()
+
+app = Starlette(
+    routes=[
+        Route("/analyze", analyze_company),
+        Route("/article", analyze_article),
+        Route("/audio/{key}", get_audio),
+        Route("/stats", get_stats),
+        Route("/metrics", get_metrics),
+    ],
+    lifespan=lifespan,
+)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP API for the news analysis pipeline")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--sources", help="JSON file with a list of search sources replacing api.SEARCH_SOURCES, e.g. to point the scraper at a stub server")
+    args = parser.parse_args(argv)
+
+    if args.sources:
+        with open(args.sources, 'r', encoding='utf-8') as sources_file:
+            api.SEARCH_SOURCES = json.load(sources_file)
+        logger.info(f"Using {len(api.SEARCH_SOURCES)} search sources from {args.sources}")
+
+    import uvicorn
+    # One process: coalescing and the queue limits are per process
+    uvicorn.run(app, host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    sys.exit(main())
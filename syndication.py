@@ -0,0 +1,281 @@
+import os
+import re
+import sys
+import time
+import zlib
+import logging
+import argparse
+import threading
+
+import resources
+
+np = resources.LazyModule("numpy")
+
+logger = logging.getLogger(__name__)
+
+# MinHash / LSH settings: NUM_PERM = LSH_BANDS * rows per band. 16 bands of 4
+# rows turn pairs above ~0.5 Jaccard similarity into candidates, which are then
+# confirmed against DUPLICATE_THRESHOLD with the full signatures.
+NUM_PERM = 64
+LSH_BANDS = 16
+SHINGLE_SIZE = 4              # Words per shingle
+DUPLICATE_THRESHOLD = 0.8     # Estimated Jaccard similarity of near-duplicate articles
+DUPLICATE_INDEX_FILE = os.environ.get("NEWS_DUPLICATE_INDEX")  # Saved index loaded instead of scanning the article cache
+WORD_PATTERN = re.compile(r'\w+')
+
+_BAND_SHIFT = 60  # Band number goes in the top 4 bits of a bucket key
+
+class MinHasher:
+    """MinHash signatures over word shingles
+
+    Shingles are hashed once with crc32, then NUM_PERM multiply-shift hash
+    functions are applied to all of them at once with numpy.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+
+    def shingles(self, text):
+        words = WORD_PATTERN.findall(text.lower())
+        if len(words) <= self.shingle_size:
+            return {' '.join(words)} if words else set()
+        return {' '.join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text):
+        """uint32 signature of a text, or None if it has no words"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+        # Wrapping uint64 arithmetic; the high 32 bits are the hash value
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+class DuplicateIndex:
+    """Near-duplicate lookup over MinHash signatures with banded LSH
+
+    Each signature is cut into LSH_BANDS bands and every band is hashed to a
+    64-bit bucket key; articles sharing a bucket are candidates. Loaded
+    indexes keep their buckets as one sorted numpy array searched with
+    searchsorted, articles added afterwards go to a dict, so memory stays
+    around 200 bytes per article and a lookup costs a few dozen
+    microseconds however many articles are stored.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, bands=LSH_BANDS, threshold=DUPLICATE_THRESHOLD, hasher=None):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        if bands > 1 << (64 - _BAND_SHIFT):
+            raise ValueError(f"At most {1 << (64 - _BAND_SHIFT)} bands are supported")
+        self.hasher = hasher or MinHasher(num_perm)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        rng = np.random.default_rng(num_perm)
+        self._row_weights = rng.integers(1, 2**63, self.rows, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._band_tags = np.arange(bands, dtype=np.uint64) << np.uint64(_BAND_SHIFT)
+        self._lock = threading.Lock()
+        self.keys = []
+        self._ids = {}  # key -> article id
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._frozen_keys = np.zeros(0, dtype=np.uint64)  # Sorted bucket keys of loaded articles
+        self._frozen_ids = np.zeros(0, dtype=np.uint32)
+        self._buckets = {}  # bucket key -> article id, or list of ids, for articles added since
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    def bucket_keys(self, signatures):
+        """Bucket key of every band, shape (..., bands)"""
+        bands = signatures.reshape(signatures.shape[:-1] + (self.bands, self.rows)).astype(np.uint64)
+        mixed = (bands * self._row_weights).sum(axis=-1)
+        return (mixed >> np.uint64(64 - _BAND_SHIFT)) | self._band_tags
+
+    def _candidates(self, buckets):
+        candidates = set()
+        if len(self._frozen_keys):
+            starts = np.searchsorted(self._frozen_keys, buckets, 'left')
+            ends = np.searchsorted(self._frozen_keys, buckets, 'right')
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                if start < end:
+                    candidates.update(self._frozen_ids[start:end].tolist())
+        for bucket in buckets.tolist():
+            ids = self._buckets.get(bucket)
+            if ids is not None:
+                if isinstance(ids, list):
+                    candidates.update(ids)
+                else:
+                    candidates.add(ids)
+        return candidates
+
+    def _best(self, signature, candidates):
+        if not candidates:
+            return None
+        ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self._signatures[ids] == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < self.threshold:
+            return None
+        return self.keys[ids[best]], float(similarity[best])
+
+    def query(self, signature):
+        """(key, estimated similarity) of the closest stored near-duplicate, or None"""
+        buckets = self.bucket_keys(signature)
+        with self._lock:
+            return self._best(signature, self._candidates(buckets))
+
+    def add(self, key, signature):
+        """Store an article's signature under its key; a key already stored is kept as is"""
+        buckets = self.bucket_keys(signature)
+        with self._lock:
+            self._add(key, signature, buckets)
+
+    def _add(self, key, signature, buckets):
+        if key in self._ids:
+            return
+        article_id = len(self.keys)
+        if article_id == len(self._signatures):
+            grown = np.zeros((max(1024, 2 * article_id), self.num_perm), dtype=np.uint32)
+            grown[:article_id] = self._signatures[:article_id]
+            self._signatures = grown
+        self._signatures[article_id] = signature
+        self.keys.append(key)
+        self._ids[key] = article_id
+        for bucket in buckets.tolist():
+            ids = self._buckets.get(bucket)
+            if ids is None:
+                self._buckets[bucket] = article_id
+            elif isinstance(ids, list):
+                ids.append(article_id)
+            else:
+                self._buckets[bucket] = [ids, article_id]
+
+    def match(self, key, text):
+        """Key of the stored article text near-duplicates, else store the text under key and return None
+
+        Lookup and insert happen under one lock, so of two copies analysed at
+        the same time exactly one becomes the original.
+        """
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return None
+        buckets = self.bucket_keys(signature)
+        with self._lock:
+            best = self._best(signature, self._candidates(buckets))
+            if best is not None and best[0] != key:
+                return best[0]
+            self._add(key, signature, buckets)
+        return None
+
+    def save(self, path):
+        """Write keys and signatures to an .npz file; buckets are rebuilt on load"""
+        with self._lock:
+            count = len(self.keys)
+            np.savez(path, keys=np.array(self.keys, dtype=str), signatures=self._signatures[:count],
+                     threshold=np.array(self.threshold), bands=np.array(self.bands))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls.from_signatures(data['keys'].tolist(), data['signatures'],
+                                       bands=int(data['bands']), threshold=float(data['threshold']))
+
+    @classmethod
+    def from_signatures(cls, keys, signatures, bands=LSH_BANDS, threshold=DUPLICATE_THRESHOLD):
+        """Index many signatures at once, with all their buckets in the sorted array"""
+        signatures = np.ascontiguousarray(signatures, dtype=np.uint32)
+        index = cls(num_perm=signatures.shape[1], bands=bands, threshold=threshold)
+        index.keys = list(keys)
+        index._ids = {key: article_id for article_id, key in enumerate(index.keys)}
+        index._signatures = signatures
+        buckets = index.bucket_keys(signatures).ravel()
+        order = np.argsort(buckets, kind='stable')
+        index._frozen_keys = buckets[order]
+        index._frozen_ids = (order // bands).astype(np.uint32)
+        return index
+
+_index = None
+_index_lock = threading.Lock()
+
+def build_from_cache(article_cache=None):
+    """Index every article stored in the article cache"""
+    from cache import get_article_cache
+    article_cache = article_cache or get_article_cache()
+    index = DuplicateIndex()
+    for entry in article_cache.entries():
+        url, article = entry.get('url'), entry.get('article')
+        if url and article and url not in index:
+            signature = index.hasher.signature(article.get('content', ''))
+            if signature is not None:
+                index.add(url, signature)
+    return index
+
+def get_index():
+    """The process-wide index: DUPLICATE_INDEX_FILE if set, else built from the article cache"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            start = time.perf_counter()
+            if DUPLICATE_INDEX_FILE and os.path.exists(DUPLICATE_INDEX_FILE):
+                _index = DuplicateIndex.load(DUPLICATE_INDEX_FILE)
+            else:
+                _index = build_from_cache()
+            logger.info(f"Near-duplicate index ready with {len(_index)} articles in {time.perf_counter() - start:.2f}s")
+        return _index
+
+def benchmark(stored=200000, queries=1000, seed=0):
+    """Build an index of `stored` random signatures and time near-duplicate lookups
+
+    Queries are perturbed copies of stored signatures (about 90% of values
+    kept), so every lookup goes through candidate verification. Returns
+    build time, mean lookup time in milliseconds and recall.
+    """
+    rng = np.random.default_rng(seed)
+    signatures = rng.integers(0, 2**32, (stored, NUM_PERM), dtype=np.uint32)
+    start = time.perf_counter()
+    index = DuplicateIndex.from_signatures([str(i) for i in range(stored)], signatures)
+    build = time.perf_counter() - start
+
+    targets = rng.integers(0, stored, queries)
+    probes = signatures[targets].copy()
+    changed = rng.random(probes.shape) < 0.1
+    probes[changed] = rng.integers(0, 2**32, int(changed.sum()), dtype=np.uint32)
+    start = time.perf_counter()
+    found = [index.query(probe) for probe in probes]
+    lookup = (time.perf_counter() - start) / queries
+    recall = sum(match is not None and match[0] == str(target) for match, target in zip(found, targets.tolist())) / queries
+    return {'stored': stored, 'build_s': build, 'lookup_ms': lookup * 1000, 'recall': recall}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and benchmark the near-duplicate article index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Index the cached articles and save the index")
+    build_parser.add_argument("-o", "--output", default=DUPLICATE_INDEX_FILE or os.path.join("cache", "duplicates.npz"))
+    benchmark_parser = commands.add_parser("benchmark", help="Time lookups against a large synthetic index")
+    benchmark_parser.add_argument("--stored", type=int, default=200000)
+    benchmark_parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        index = build_from_cache()
+        index.save(args.output)
+        print(f"Indexed {len(index)} cached articles into {args.output}")
+        return 0
+
+    result = benchmark(args.stored, args.queries)
+    print(f"{result['stored']} articles indexed in {result['build_s']:.2f}s; "
+          f"lookup {result['lookup_ms']:.3f} ms, recall {result['recall']:.1%}")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
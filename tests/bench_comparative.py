@@ -0,0 +1,37 @@
+"""Time generate_comparative_analysis against the legacy all-pairs loops
+
+Every timed size is also checked field by field against the legacy output
+(coverage differences excepted, see helpers.COVERAGE_FIELDS). The legacy
+code is quadratic: 10000 articles take about 15 seconds.
+
+    python tests/bench_comparative.py [sizes...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api
+from helpers import synthetic_articles, comparable
+from legacy_comparative import generate_comparative_analysis as legacy_comparative_analysis
+
+def benchmark(sizes=(5, 100, 1000, 10000), seed=0):
+    """Seconds per call of both implementations and whether the outputs match, per size"""
+    api.generate_comparative_analysis(synthetic_articles(2, seed))  # The first call imports numpy
+    results = {}
+    for count in sizes:
+        articles = synthetic_articles(count, seed)
+        start = time.perf_counter()
+        analysis = api.generate_comparative_analysis(articles)
+        current = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = legacy_comparative_analysis(articles)
+        legacy = time.perf_counter() - start
+        results[count] = {'seconds': current, 'legacy_seconds': legacy, 'matches': comparable(analysis) == comparable(expected)}
+    return results
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or (5, 100, 1000, 10000)
+    for count, result in benchmark(sizes).items():
+        print(f"{count:>6} articles: {result['seconds'] * 1000:9.1f} ms (legacy {result['legacy_seconds'] * 1000:10.1f} ms), matches legacy: {result['matches']}")
@@ -0,0 +1,112 @@
+import os
+import re
+import sys
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api
+import cache
+import topics
+import analysis
+import resources
+import syndication
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+FALLBACK_STOPWORDS = ['the', 'a', 'an', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'at', 'by', 'with',
+                      'is', 'was', 'are', 'its', 'it', 'as', 'that', 'this', 'from', 'after', 'will', 'would']
+
+class NewsHandler(BaseHTTPRequestHandler):
+    """Serves tests/pages: /search/<source> result pages and /articles/<name> article pages
+
+    Every page carries an ETag and is answered with 304 when it matches.
+    Setting server.fail_status answers every request with that status.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+        if server.fail_status:
+            return self._send(server.fail_status, b"")
+        route = re.match(r'^/(search|articles)/([\w-]+)', self.path)
+        page = os.path.join(PAGES_DIR, route.group(1), route.group(2) + ".html") if route else None
+        if page is None or not os.path.exists(page):
+            return self._send(404, b"")
+        with open(page, 'r', encoding='utf-8') as page_file:
+            body = page_file.read().replace("{base}", server.base_url).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, b"", etag)
+        self._send(200, body, etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture(scope="session")
+def news_server():
+    """Local stand-in for the search sources and news sites"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), NewsHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.fail_status = None
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def nltk_data(monkeypatch):
+    """NLTK's data if installed, else a regex sentence splitter and a short stopword list
+
+    Lets the pipeline tests run on machines without network access; run
+    `python resources.py preflight` to test against the real models.
+    """
+    try:
+        resources.ensure(resources.sentence_resource())
+        resources.ensure('stopwords')
+    except LookupError:
+        monkeypatch.setattr(analysis, "sent_tokenize", lambda text: [s for s in re.split(r'(?<=[.!?])\s+', text) if s])
+        monkeypatch.setattr(resources, "stopwords", lambda lang='english': FALLBACK_STOPWORDS)
+        monkeypatch.setattr(topics, "_stop_words", None)
+
+@pytest.fixture
+def news_sources(news_server, nltk_data, tmp_path, monkeypatch):
+    """Point the scraper at news_server, with fresh caches and indexes under tmp_path
+
+    Yields the server; its request log is cleared first.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cache, "_caches", {})
+    cache.stats.reset()
+    monkeypatch.setattr(syndication, "_index", None)
+    monkeypatch.setattr(topics, "_index", None)
+    monkeypatch.setattr(topics, "TOPIC_INDEX_DIR", str(tmp_path / "topic_index"))
+    base = news_server.base_url
+    monkeypatch.setattr(api, "SEARCH_SOURCES", [
+        {'name': 'google', 'url': base + "/search/google?q={query}", 'selector': 'div.SoaBEf', 'base_url': "", 'quality': 1},
+        {'name': 'economictimes', 'url': base + "/search/et?q={query}", 'selector': 'div.eachStory', 'base_url': base, 'quality': 2},
+        {'name': 'business-standard', 'url': base + "/search/bs?q={query}", 'selector': 'div.listing-main', 'base_url': base, 'quality': 2},
+    ])
+    with news_server.lock:
+        news_server.requests.clear()
+    news_server.fail_status = None
+    yield news_server
+    news_server.fail_status = None
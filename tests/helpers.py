@@ -0,0 +1,30 @@
+import random
+
+# Coverage differences were deliberately changed to ranked pair divergence
+COVERAGE_FIELDS = ('coverage_differences',)
+
+def synthetic_articles(count, seed=0, topic_pool=40):
+    """Articles with random sentiment, sources and topics drawn from a fixed pool"""
+    rng = random.Random(seed)
+    topics = [f"Topic {i}" for i in range(topic_pool)]
+    sources = ["Economic Times", "Business Standard", "Reuters", "Mint"]
+    articles = []
+    for i in range(count):
+        score = round(rng.uniform(-1, 1), 2)
+        label = "Positive" if score > 0.2 else "Negative" if score < -0.2 else "Neutral"
+        articles.append({
+            'title': f"Synthetic article {i} on {rng.choice(topics)}",
+            'source': rng.choice(sources),
+            'sentiment': {'label': label, 'score': score},
+            'topics': rng.sample(topics, rng.randint(1, min(5, topic_pool))),
+        })
+    return articles
+
+def comparable(analysis):
+    """Analysis fields expected to match the legacy implementation
+
+    "Common Topics" comes from a set, so its order is arbitrary in both.
+    """
+    fields = {field: value for field, value in analysis.items() if field not in COVERAGE_FIELDS}
+    fields['topic_overlap'] = dict(fields['topic_overlap'], **{"Common Topics": sorted(fields['topic_overlap']["Common Topics"])})
+    return fields
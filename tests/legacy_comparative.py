@@ -0,0 +1,99 @@
+"""generate_comparative_analysis as it was before the inverted topic index
+
+Kept as the reference for the comparative parity test and benchmark, verbatim
+except for the coverage differences (see helpers.COVERAGE_FIELDS).
+"""
+from collections import Counter
+
+from api import truncate_text
+
+def generate_comparative_analysis(articles):
+    """Generate comparative analysis across all articles"""
+    # Count sentiments
+    sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
+    sentiment_scores = []
+    all_topics = []
+    
+    for article in articles:
+        sentiment_counts[article['sentiment']['label']] += 1
+        sentiment_scores.append(article['sentiment']['score'])
+        all_topics.extend(article['topics'])
+    
+    # Calculate average sentiment score
+    average_sentiment_score = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
+    
+    # Find common topics
+    topic_counts = Counter(all_topics)
+    common_topics = topic_counts.most_common(10)
+    
+    # Group sources
+    sources = Counter([article['source'] for article in articles])
+    
+    # The all-pairs coverage differences loop is left out: ranked pair
+    # divergence replaced its output, and at 10000 articles it builds ~50M dicts
+    coverage_differences = []
+    
+    # Calculate topic overlap
+    all_article_topics = [set(article['topics']) for article in articles]
+    if all_article_topics:
+        common_topics_set = set.intersection(*all_article_topics)
+    else:
+        common_topics_set = set()
+    
+    # Find unique topics per article
+    unique_topics_by_article = []
+    for i, article in enumerate(articles):
+        other_topics = []
+        for j, other_article in enumerate(articles):
+            if i != j:
+                other_topics.extend(other_article['topics'])
+        
+        unique = [topic for topic in article['topics'] if topic not in other_topics]
+        if unique:
+            unique_topics_by_article.append({
+                "Article": i+1,
+                "Title": truncate_text(article['title'], 40),
+                "Unique Topics": unique
+            })
+    
+    # Build topic overlap structure
+    topic_overlap = {
+        "Common Topics": list(common_topics_set),
+        "Unique Topics": {}
+    }
+    
+    for i, article in enumerate(articles):
+        article_unique_topics = []
+        for topic in article['topics']:
+            exists_elsewhere = False
+            for j, other_article in enumerate(articles):
+                if i != j and topic in other_article['topics']:
+                    exists_elsewhere = True
+                    break
+            
+            if not exists_elsewhere and topic not in topic_overlap["Common Topics"]:
+                article_unique_topics.append(topic)
+        
+        if article_unique_topics:
+            topic_overlap["Unique Topics"][f"Article {i+1}"] = article_unique_topics
+    
+    # Generate overall sentiment analysis
+    final_sentiment = ""
+    if average_sentiment_score > 0.2:
+        final_sentiment = f"Overall, the news coverage about {articles[0]['topics'][0]} is predominantly positive, indicating strong market sentiment."
+    elif average_sentiment_score < -0.2:
+        final_sentiment = f"Overall, the news coverage about {articles[0]['topics'][0]} is predominantly negative, suggesting potential challenges ahead."
+    else:
+        final_sentiment = f"Overall, the news coverage about {articles[0]['topics'][0]} is mostly neutral, reflecting a balanced view of the company's current position."
+    
+    return {
+        'sentiment_counts': sentiment_counts,
+        'average_sentiment_score': average_sentiment_score,
+        'common_topics': common_topics,
+        'coverage_differences': coverage_differences,
+        'topic_overlap': topic_overlap,
+        'unique_topics_by_article': unique_topics_by_article,
+        'sources': sources,
+        'total_articles': len(articles),
+        'final_sentiment_analysis': final_sentiment
+    }
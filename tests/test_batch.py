@@ -0,0 +1,34 @@
+import os
+import json
+import pstats
+
+import pytest
+
+import batch
+import metrics
+
+def test_report_paths_are_unique():
+    paths = batch.report_paths("reports", ["AT&T", "AT T", "at-t", "Acme", "!!!"])
+
+    assert paths == {
+        "AT&T": os.path.join("reports", "at-t.json"),
+        "AT T": os.path.join("reports", "at-t-2.json"),
+        "at-t": os.path.join("reports", "at-t-3.json"),
+        "Acme": os.path.join("reports", "acme.json"),
+        "!!!": os.path.join("reports", "company.json"),
+    }
+
+@pytest.mark.parametrize("profile", metrics.PROFILE_ENGINES)
+def test_profile_extension_follows_the_engine_used(news_sources, tmp_path, profile):
+    path = batch.report_paths(str(tmp_path), ["Acme"])["Acme"]
+
+    result = batch.analyze_company("Acme", 2, path, profile=profile)
+
+    with open(result['path'], 'r', encoding='utf-8') as report_file:
+        assert json.load(report_file)["Company"] == "Acme"
+    extension = metrics.PROFILE_EXTENSIONS[metrics.profile_engine(profile)]
+    profile_path = os.path.join(str(tmp_path), "acme." + extension)
+    assert os.path.exists(profile_path)
+    if extension == "prof":
+        # Loads as cProfile data, whichever engine was asked for
+        pstats.Stats(profile_path)
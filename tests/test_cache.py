@@ -0,0 +1,52 @@
+import os
+import time
+
+import cache
+import tts
+
+def entry_count(directory):
+    return len([name for name in os.listdir(directory) if name.endswith(".json")])
+
+def test_entry_cap_holds_across_processes(tmp_path):
+    # Two workers sharing one cache directory, each with its own DiskCache
+    first = cache.DiskCache(str(tmp_path), ttl=60, max_entries=5)
+    second = cache.DiskCache(str(tmp_path), ttl=60, max_entries=5)
+    for i in range(4):
+        first.put_entry(f"first-{i}", {'value': i})
+    for i in range(4):
+        second.put_entry(f"second-{i}", {'value': i})
+
+    assert entry_count(tmp_path) == 5
+    assert second.get_entry("second-3")['value'] == 3
+    assert first.get_entry("first-0") is None
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    disk_cache = cache.DiskCache(str(tmp_path), ttl=60, max_entries=3)
+    for key in ("a", "b", "c"):
+        disk_cache.put_entry(key, {'key': key})
+        # Distinct mtimes even on filesystems with coarse timestamps
+        past = time.time() - 100 + len(os.listdir(tmp_path))
+        os.utime(disk_cache._path(key), (past, past))
+    assert disk_cache.get_entry("a") is not None  # a becomes the most recently used
+
+    disk_cache.put_entry("d", {'key': "d"})
+
+    assert disk_cache.get_entry("b") is None
+    assert sorted(entry['key'] for entry in disk_cache.entries()) == ["a", "c", "d"]
+
+def test_clear_removes_entries_of_other_instances(tmp_path):
+    cache.DiskCache(str(tmp_path), ttl=60, max_entries=5).put_entry("a", {'key': "a"})
+    cache.DiskCache(str(tmp_path), ttl=60, max_entries=5).clear()
+    assert entry_count(tmp_path) == 0
+
+def test_audio_size_cap_holds_across_processes(tmp_path):
+    first = tts.AudioStore(str(tmp_path), max_bytes=250)
+    second = tts.AudioStore(str(tmp_path), max_bytes=250)
+    first.put("clip-1", b"1" * 100)
+    first.put("clip-2", b"2" * 100)
+    second.put("clip-3", b"3" * 100)
+
+    sizes = [os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path) if name.endswith(".audio")]
+    assert sum(sizes) <= 250
+    assert second.get("clip-3") == b"3" * 100
+    assert first.get("clip-1") is None
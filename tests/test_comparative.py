@@ -0,0 +1,61 @@
+import random
+
+import numpy as np
+import pytest
+
+import api
+import comparative
+from helpers import synthetic_articles, comparable
+from legacy_comparative import generate_comparative_analysis as legacy_comparative_analysis
+
+@pytest.mark.parametrize("count", [1, 2, 5, 37, 100, 300])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_legacy_analysis(count, seed):
+    articles = synthetic_articles(count, seed)
+    assert comparable(api.generate_comparative_analysis(articles)) == comparable(legacy_comparative_analysis(articles))
+
+def test_shared_topics_match_legacy():
+    # A small topic pool gives common topics and few unique ones
+    articles = synthetic_articles(50, seed=3, topic_pool=6)
+    assert comparable(api.generate_comparative_analysis(articles)) == comparable(legacy_comparative_analysis(articles))
+
+def brute_force_pairs(articles, k):
+    """Score every pair with the same float32 arithmetic as PairRanker"""
+    n = len(articles)
+    scores = np.array([article['sentiment']['score'] for article in articles], dtype=np.float32)
+    labels = [article['sentiment']['label'] for article in articles]
+    topics = [set(article['topics']) for article in articles]
+    ranked = []
+    for i in range(n):
+        for j in range(i + 1, n):
+            shared = np.float32(len(topics[i] & topics[j]))
+            union = np.float32(len(topics[i])) + np.float32(len(topics[j])) - shared
+            jaccard_distance = np.float32(1.0) - (shared / union if union > 0 else np.float32(1.0))
+            sentiment_gap = np.abs(scores[j] - scores[i]) / np.float32(2.0)
+            divergence = np.float32(comparative.SENTIMENT_WEIGHT) * sentiment_gap + np.float32(comparative.TOPIC_WEIGHT) * jaccard_distance
+            if labels[i] != labels[j] or (shared < len(topics[i]) and shared < len(topics[j])):
+                ranked.append((-float(divergence), i, j))
+    return [(i, j) for _, i, j in sorted(ranked)[:k]]
+
+@pytest.mark.parametrize("seed", range(40))
+def test_rank_pairs_matches_brute_force(seed, monkeypatch):
+    rng = random.Random(seed)
+    articles = synthetic_articles(rng.randint(0, 40), seed, topic_pool=rng.choice([2, 4, 10, 40]))
+    for article in articles:
+        # Bunched scores and topicless articles exercise ties and the unpruned path
+        if seed % 3 == 1:
+            article['sentiment']['score'] = rng.choice([0.0, 0.5, -0.5])
+        if seed % 3 == 2 and rng.random() < 0.2:
+            article['topics'] = []
+    monkeypatch.setattr(comparative, "BLOCK_PAIRS", rng.choice([1, 3, 65536]))
+    k = rng.choice([1, 3, 5, 20])
+    assert comparative.rank_pairs(articles, k) == brute_force_pairs(articles, k)
+
+def test_accumulator_snapshots_match_full_analysis():
+    articles = synthetic_articles(60, seed=7, topic_pool=12)
+    accumulator = api.ComparativeAccumulator()
+    for count, article in enumerate(articles, start=1):
+        accumulator.add(article)
+        snapshot = accumulator.snapshot()
+        assert comparable(snapshot) == comparable(legacy_comparative_analysis(articles[:count]))
+        assert len(snapshot['coverage_differences']) <= 5
@@ -0,0 +1,75 @@
+import pytest
+
+import api
+
+# Search results ordered by source quality with the tracking-parameter copy of
+# acme-results dropped; acme-empty has no article content
+EXPECTED_LINKS = ["acme-results", "acme-layoffs", "acme-outlook", "acme-empty", "acme-growth", "acme-plant"]
+
+def article_requests(server):
+    with server.lock:
+        return [path for path in server.requests if path.startswith("/articles/")]
+
+def slugs(urls):
+    return [url.rsplit("/", 1)[-1] for url in urls]
+
+def test_candidate_links_are_ranked_and_deduplicated(news_sources):
+    links = api.collect_candidate_links("Acme", use_cache=False)
+    assert slugs(links) == EXPECTED_LINKS
+
+@pytest.mark.parametrize("mode", api.FETCH_MODES)
+def test_fetch_news_fetches_only_needed_articles(news_sources, mode):
+    articles = api.fetch_news("Acme", 4, mode=mode, use_cache=False)
+
+    # Search result order, without the page that has no content, and no mock articles
+    assert slugs(article['url'] for article in articles) == ["acme-results", "acme-layoffs", "acme-outlook", "acme-growth"]
+    assert all(article['audio_key'] for article in articles)
+    # Four articles plus the one that failed; acme-plant is never requested
+    assert sorted(article_requests(news_sources)) == sorted("/articles/" + slug for slug in EXPECTED_LINKS[:5])
+
+@pytest.mark.parametrize("mode", api.FETCH_MODES)
+def test_iter_news_stops_fetching_when_closed(news_sources, mode):
+    stream = api.iter_news("Acme", 4, mode=mode, use_cache=False)
+    first = next(stream)
+    stream.close()
+
+    assert first['title']
+    # At most the extractions that were in flight when the first article arrived
+    assert len(article_requests(news_sources)) <= 4
+
+def test_fetch_news_fills_up_with_mock_articles(news_sources):
+    articles = api.fetch_news("Acme", 7, use_cache=False)
+
+    assert len(articles) == 7
+    assert slugs(article['url'] for article in articles[:5]) == ["acme-results", "acme-layoffs", "acme-outlook", "acme-growth", "acme-plant"]
+    assert [article['url'] for article in articles[5:]] == ["https://example.com/news/acme-article-6", "https://example.com/news/acme-article-7"]
+
+def test_stale_cache_entries_are_revalidated_without_parsing(news_sources, monkeypatch):
+    first = api.fetch_news("Acme", 2, mode="sequential")
+    # Everything is stale now: the next fetch sends conditional requests and gets 304s
+    monkeypatch.setattr(api.get_article_cache(), "ttl", -1)
+    monkeypatch.setattr(api.get_page_cache(), "ttl", -1)
+    monkeypatch.setattr(api, "parse_article_page", lambda *args, **kwargs: pytest.fail("revalidated page was parsed"))
+
+    again = api.fetch_news("Acme", 2, mode="sequential")
+
+    assert again == first
+    host = news_sources.base_url.split("//", 1)[1]
+    # Three search pages and the two articles
+    assert api.cache_stats.snapshot()[host]['revalidated'] == 5
+
+@pytest.mark.parametrize("failure", ["status", "exception"])
+def test_stale_cache_entries_are_served_when_the_source_fails(news_sources, monkeypatch, failure):
+    first = api.fetch_news("Acme", 2, mode="sequential")
+    monkeypatch.setattr(api.get_article_cache(), "ttl", -1)
+    monkeypatch.setattr(api.get_page_cache(), "ttl", -1)
+    if failure == "status":
+        news_sources.fail_status = 404
+    else:
+        def unreachable(url, **kwargs):
+            raise ConnectionError(f"cannot reach {url}")
+        monkeypatch.setattr(api.http_client, "get", unreachable)
+
+    again = api.fetch_news("Acme", 2, mode="sequential")
+
+    assert again == first
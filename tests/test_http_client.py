@@ -0,0 +1,98 @@
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+import http_client
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers /<status>?retry_after=<value> with that status and Retry-After header"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append((self.path, time.monotonic()))
+        path, _, query = self.path.partition("?")
+        self.send_response(int(path.strip("/")))
+        if query.startswith("retry_after="):
+            self.send_header('Retry-After', query.split("=", 1)[1])
+        self.send_header('Content-Length', "0")
+        self.end_headers()
+
+@pytest.fixture
+def scripted_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ScriptedHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_client(**kwargs):
+    return http_client.HttpClient(throttle=http_client.HostThrottle(max_per_host=1, min_interval=0), **kwargs)
+
+def test_retries_with_capped_backoff(scripted_server):
+    client = make_client(max_retries=3, backoff_factor=0.05, backoff_max=0.1)
+
+    response = client.get(scripted_server.base_url + "/503")
+
+    assert response.status_code == 503
+    times = [when for _, when in scripted_server.requests]
+    assert len(times) == 4
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    # 0.05s, 0.1s, then capped at 0.1s instead of 0.2s
+    assert gaps[0] >= 0.05 and all(gap >= 0.1 for gap in gaps[1:])
+    assert max(gaps) < 0.2
+
+def test_short_retry_after_is_respected(scripted_server):
+    client = make_client(max_retries=1, backoff_factor=0, max_retry_after=1)
+
+    start = time.monotonic()
+    response = client.get(scripted_server.base_url + "/429?retry_after=1")
+
+    assert response.status_code == 429
+    assert len(scripted_server.requests) == 2
+    assert time.monotonic() - start >= 1
+
+def test_long_retry_after_is_returned_at_once(scripted_server):
+    client = make_client(max_retries=3, max_retry_after=5)
+
+    start = time.monotonic()
+    response = client.get(scripted_server.base_url + "/503?retry_after=3600")
+
+    assert response.status_code == 503
+    assert len(scripted_server.requests) == 1
+    assert time.monotonic() - start < 1
+
+def test_retry_wait_does_not_hold_the_host_slot(scripted_server):
+    # One request at a time per host: a retrying request must not block the host while it waits
+    client = make_client(max_retries=1, max_retry_after=2)
+    retrying = threading.Thread(target=client.get, args=(scripted_server.base_url + "/503?retry_after=1",))
+    retrying.start()
+    while not scripted_server.requests:
+        time.sleep(0.01)
+
+    start = time.monotonic()
+    assert client.get(scripted_server.base_url + "/200").status_code == 200
+    assert time.monotonic() - start < 0.5
+    retrying.join()
+
+def test_connection_errors_are_retried_then_raised():
+    client = make_client(max_retries=2, backoff_factor=0.01)
+    # Nothing listens on port 9 of the loopback interface
+    with pytest.raises(requests.ConnectionError):
+        client.get("http://127.0.0.1:9/")
+
+@pytest.mark.parametrize("value, expected", [("3", 3.0), ("-1", 0.0), ("soon", None), ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0)])
+def test_retry_after_parsing(value, expected):
+    class Response:
+        headers = {'Retry-After': value}
+    assert http_client.retry_after(Response) == expected
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+import api
+import parsing
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages", "profiles")
+
+# page -> (url it is served from, expected fields)
+PAGES = {
+    'economictimes': ("https://economictimes.indiatimes.com/industry/tata-tesla/articleshow/1.cms", {
+        'title': "Tata group partners with Tesla on electric vehicle parts",
+        'content': "Tata group companies will supply components to Tesla, people familiar with the matter said. "
+                   "The partnership could make India a larger part of the electric vehicle supply chain.",
+        'date': "2025-03-18",
+    }),
+    'business-standard': ("https://www.business-standard.com/about/what-is-samsung", {
+        'title': "What is Samsung planning for its India factories?",
+        'content': "Samsung plans to expand production at its Noida plant, the company said on Monday. "
+                   "The expansion is expected to add capacity for smartphones and tablets.",
+        'date': "2025-03-03",
+    }),
+    'generic-article': ("https://news.example.com/acme-merger", {
+        'title': "Regulators approve the Acme merger",
+        'content': "Regulators approved the Acme merger on Tuesday after a year long review. "
+                   "The deal creates the largest logistics company in the region.",
+        'date': "2025-01-07",
+    }),
+    # No profile or generic selector matches: title falls back and content comes from the paragraph scan
+    'paragraph-scan': ("https://news.example.com/acme-shares", {
+        'title': "Article about Acme",
+        'content': "Acme shares fell after the company warned that supply problems would delay shipments this spring. "
+                   "Executives said the shortage of chips should ease by the end of the second quarter of the year.",
+        'date': "Recent",
+    }),
+}
+
+def read_page(name):
+    with open(os.path.join(PROFILES_DIR, name + ".html"), 'r', encoding='utf-8') as page_file:
+        return page_file.read()
+
+@pytest.mark.parametrize("targeted", [False, True])
+@pytest.mark.parametrize("backend", parsing.available_backends())
+@pytest.mark.parametrize("name", sorted(PAGES))
+def test_parse_article_page(name, backend, targeted):
+    url, expected = PAGES[name]
+    assert api.parse_article_page(read_page(name), "Acme", backend=backend, targeted=targeted, url=url) == expected
+
+def test_page_without_content_is_skipped():
+    html = "<html><body><h1>Acme</h1><p>Too short.</p></body></html>"
+    for backend in parsing.available_backends():
+        assert api.parse_article_page(html, "Acme", backend=backend, targeted=True) is None
+
+def test_served_articles_parse_alike_in_every_mode(news_sources):
+    # The fetch tests already pin which pages are fetched; here the parsed fields must not depend on the engine
+    results = {mode: api.fetch_news("Acme", 5, mode=mode, use_cache=False) for mode in api.FETCH_MODES}
+    first = results[api.FETCH_MODES[0]]
+    for mode, articles in results.items():
+        assert [(a['title'], a['content'], a['date']) for a in articles] == \
+               [(a['title'], a['content'], a['date']) for a in first], mode
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+from textblob import TextBlob
+
+import api
+import sentiment
+
+TEXTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sentiment_texts.txt")
+
+def load_texts():
+    with open(TEXTS_PATH, 'r', encoding='utf-8') as texts_file:
+        return texts_file.read().splitlines() + [""]
+
+def textblob_sentiment(text):
+    """The per-article TextBlob scoring the batch engine replaced"""
+    polarity = TextBlob(text).sentiment.polarity
+    if polarity > 0.1:
+        label = "Positive"
+    elif polarity < -0.1:
+        label = "Negative"
+    else:
+        label = "Neutral"
+    return {'label': label, 'score': polarity}
+
+TEXTS = load_texts()
+
+def test_batch_scores_match_textblob_exactly():
+    assert sentiment.analyze_batch(TEXTS) == [textblob_sentiment(text) for text in TEXTS]
+
+def test_pipeline_sentiment_matches_textblob(nltk_data):
+    assert api.analyze_sentiment_batch(TEXTS) == [textblob_sentiment(text) for text in TEXTS]
+
+@pytest.mark.parametrize("text", TEXTS[:5])
+def test_single_text_matches_batch(text, nltk_data):
+    assert api.analyze_sentiment(text) == textblob_sentiment(text)
@@ -0,0 +1,104 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from starlette.testclient import TestClient
+
+import service
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("timed out waiting for the service")
+        time.sleep(0.01)
+
+@pytest.fixture
+def fresh_service(monkeypatch):
+    """New pools and coalescer, since the app's lifespan shuts the pools down on exit"""
+    monkeypatch.setattr(service, "analysis_pool", service.BoundedPool("analysis", service.ANALYSIS_WORKERS, service.ANALYSIS_QUEUE))
+    monkeypatch.setattr(service, "article_pool", service.BoundedPool("article", service.ARTICLE_WORKERS, service.ARTICLE_QUEUE))
+    monkeypatch.setattr(service, "audio_pool", service.BoundedPool("audio", service.AUDIO_WORKERS, service.AUDIO_QUEUE))
+    monkeypatch.setattr(service, "coalescer", service.Coalescer())
+
+@pytest.fixture
+def blocked_pipeline(fresh_service, monkeypatch):
+    """run_pipeline held until release is set
+
+    Yields (release, calls): calls lists the companies run_pipeline started for.
+    """
+    release = threading.Event()
+    calls = []
+
+    def run_pipeline(company_name, num_articles):
+        calls.append(company_name)
+        release.wait(10)
+        return {'Company': company_name, 'Articles': [], 'Run': len(calls)}
+
+    monkeypatch.setattr(service, "run_pipeline", run_pipeline)
+    yield release, calls
+    release.set()
+
+def test_concurrent_requests_share_one_run(blocked_pipeline):
+    release, calls = blocked_pipeline
+    with TestClient(service.app) as client, ThreadPoolExecutor(max_workers=4) as executor:
+        # Same key: the company name is matched case-insensitively
+        futures = [executor.submit(client.get, "/analyze", params={'company': name, 'articles': 3})
+                   for name in ("Acme", "acme", "ACME ", "Acme")]
+        wait_for(lambda: service.coalescer.coalesced == 3)
+        release.set()
+        responses = [future.result() for future in futures]
+
+        assert [response.status_code for response in responses] == [200] * 4
+        assert len({response.text for response in responses}) == 1
+        assert len(calls) == 1
+        stats = client.get("/stats").json()
+        assert stats['coalescing'] == {'in_flight': 0, 'started': 1, 'coalesced': 3}
+
+def test_different_article_counts_are_not_coalesced(blocked_pipeline):
+    release, calls = blocked_pipeline
+    release.set()
+    with TestClient(service.app) as client:
+        client.get("/analyze", params={'company': "Acme", 'articles': 3})
+        client.get("/analyze", params={'company': "Acme", 'articles': 4})
+    assert calls == ["Acme", "Acme"]
+
+def test_full_pool_answers_429(blocked_pipeline, monkeypatch):
+    release, calls = blocked_pipeline
+    monkeypatch.setattr(service, "analysis_pool", service.BoundedPool("analysis", 1, 0))
+    with TestClient(service.app) as client, ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(client.get, "/analyze", params={'company': "Acme"})
+        wait_for(lambda: calls)
+
+        busy = client.get("/analyze", params={'company': "Globex"})
+        assert busy.status_code == 429
+        assert busy.headers['Retry-After'] == str(service.RETRY_AFTER)
+        assert "analysis" in busy.json()['error']
+
+        # A request for the running company joins it instead of being turned away
+        joined = executor.submit(client.get, "/analyze", params={'company': "acme"})
+        wait_for(lambda: service.coalescer.coalesced == 1)
+        release.set()
+        assert first.result().status_code == 200
+        assert joined.result().json() == first.result().json()
+        assert service.analysis_pool.snapshot()['rejected'] == 1
+
+        # Once the slot is free the next company gets through
+        assert client.get("/analyze", params={'company': "Globex"}).status_code == 200
+    assert calls == ["Acme", "Globex"]
+
+@pytest.mark.parametrize("query", [{}, {'company': " "}, {'company': "Acme", 'articles': "x"},
+                                   {'company': "Acme", 'articles': service.MAX_ARTICLES + 1}])
+def test_bad_parameters_answer_400(blocked_pipeline, query):
+    with TestClient(service.app) as client:
+        assert client.get("/analyze", params=query).status_code == 400
+
+def test_analyze_runs_the_pipeline(news_sources, fresh_service):
+    with TestClient(service.app) as client:
+        report = client.get("/analyze", params={'company': "Acme", 'articles': 3}).json()
+
+    assert report["Company"] == "Acme"
+    assert [entry["URL"].rsplit("/", 1)[-1] for entry in report["Articles"]] == ["acme-results", "acme-layoffs", "acme-outlook"]
+    assert all(entry["Audio"].startswith("/audio/") for entry in report["Articles"])
+    assert report["Audio"].startswith("/audio/")
@@ -0,0 +1,271 @@
+import os
+import json
+import math
+import time
+import atexit
+import hashlib
+import tempfile
+import threading
+import logging
+from collections import Counter
+
+from analysis import AnalysisDocument
+from utils import create_cache_dir, file_lock
+import resources
+
+np = resources.LazyModule("numpy")
+
+logger = logging.getLogger(__name__)
+
+# Corpus index settings
+TOPIC_INDEX_DIR = os.path.join("cache", "topic_index")
+AUTOSAVE_EVERY = 50   # Ingested documents between automatic saves
+
+# News page boilerplate that is never a useful topic, on top of NLTK's English stopwords
+DOMAIN_STOPWORDS = frozenset({
+    'said', 'says', 'according', 'also', 'per', 'cent',
+    'read', 'click', 'subscribe', 'advertisement',
+})
+
+_stop_words = None
+_stop_words_lock = threading.Lock()
+
+def stop_words():
+    """English and domain stopwords as one frozen set, loaded from NLTK once"""
+    global _stop_words
+    with _stop_words_lock:
+        if _stop_words is None:
+            _stop_words = frozenset(resources.stopwords('english')) | DOMAIN_STOPWORDS
+        return _stop_words
+
+def add_domain_stopwords(words):
+    """Extend the domain stoplist, e.g. with words common to one company's coverage"""
+    global DOMAIN_STOPWORDS, _stop_words
+    with _stop_words_lock:
+        DOMAIN_STOPWORDS = DOMAIN_STOPWORDS | frozenset(word.lower() for word in words)
+        _stop_words = None
+
+class TopicIndex:
+    """Incremental corpus document frequencies for TF-IDF topic ranking
+    
+    Terms map to ids in an in-memory vocabulary; document frequencies live
+    in a growable int32 array and ingested documents are remembered by
+    64-bit content hashes, so re-ingesting an article is a no-op. On disk
+    the arrays are .npy files that are memory-mapped when loaded and only
+    copied into memory on the first update. Several processes can share one
+    directory: saving merges the documents ingested since the last save into
+    whatever is on disk.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self.vocab = {}
+        self.terms = []
+        self.df = np.zeros(1024, dtype=np.int32)
+        self.doc_hashes = set()
+        self.n_docs = 0
+        self._writable = True
+        self._pending = []  # (hash, terms) ingested since the last save
+        if path and os.path.exists(os.path.join(path, "meta.json")):
+            self._load()
+
+    def _load(self):
+        with open(os.path.join(self.path, "meta.json"), 'r') as meta_file:
+            meta = json.load(meta_file)
+        with open(os.path.join(self.path, "vocab.txt"), 'r', encoding='utf-8') as vocab_file:
+            self.terms = vocab_file.read().split('\n')[:meta['n_terms']]
+        self.vocab = {term: term_id for term_id, term in enumerate(self.terms)}
+        self.df = np.load(os.path.join(self.path, "df.npy"), mmap_mode='r')
+        self.doc_hashes = set(np.load(os.path.join(self.path, "docs.npy")).tolist())
+        self.n_docs = meta['n_docs']
+        self._writable = False
+
+    @staticmethod
+    def doc_hash(text):
+        return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+    def ingest(self, text, terms):
+        """Count a document's distinct terms once; returns False if it was already ingested"""
+        key = self.doc_hash(text)
+        terms = set(terms)
+        with self._lock:
+            if not self._add(key, terms):
+                return False
+            self._pending.append((key, terms))
+            autosave = self.path and len(self._pending) >= AUTOSAVE_EVERY
+        if autosave:
+            self.save()
+        return True
+
+    def _add(self, key, terms):
+        # Callers hold self._lock
+        if key in self.doc_hashes:
+            return False
+        if not self._writable:
+            self.df = np.array(self.df, dtype=np.int32)
+            self._writable = True
+        ids = []
+        for term in terms:
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                term_id = len(self.terms)
+                self.vocab[term] = term_id
+                self.terms.append(term)
+            ids.append(term_id)
+        if len(self.terms) > len(self.df):
+            grown = np.zeros(max(len(self.terms), 2 * len(self.df)), dtype=np.int32)
+            grown[:len(self.df)] = self.df
+            self.df = grown
+        if ids:
+            self.df[np.asarray(ids, dtype=np.intp)] += 1
+        self.doc_hashes.add(key)
+        self.n_docs += 1
+        return True
+
+    def idf(self, term):
+        """Smoothed inverse document frequency of a term"""
+        return self.idfs([term])[0]
+
+    def idfs(self, terms):
+        """Smoothed inverse document frequencies of several terms, read under one lock
+        
+        save() swaps vocab and df for renumbered ones, so both must be read
+        together.
+        """
+        with self._lock:
+            ids = [self.vocab.get(term) for term in terms]
+            dfs = [int(self.df[term_id]) if term_id is not None else 0 for term_id in ids]
+            n_docs = self.n_docs
+        return [math.log((1 + n_docs) / (1 + df)) + 1 for df in dfs]
+
+    def save(self):
+        """Merge the documents ingested since the last save into the index on disk
+        
+        Runs under a file lock, so processes sharing the directory never
+        overwrite each other's documents; documents other processes saved
+        meanwhile are picked up here too.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        create_cache_dir(self.path)
+        with file_lock(os.path.join(self.path, "index.lock")):
+            try:
+                merged = TopicIndex(self.path)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Overwriting unreadable topic index {self.path}: {e}")
+                merged = TopicIndex()
+                merged.path = self.path
+            added = [merged._add(key, terms) for key, terms in pending]
+            if any(added):
+                merged._write()
+        with self._lock:
+            # Re-apply documents ingested while the merge ran
+            late = self._pending
+            self.vocab, self.terms, self.df = merged.vocab, merged.terms, merged.df
+            self.doc_hashes, self.n_docs, self._writable = merged.doc_hashes, merged.n_docs, merged._writable
+            for key, terms in late:
+                self._add(key, terms)
+
+    def _write(self):
+        """Write the index atomically, file by file"""
+        terms = self.terms
+        df = np.array(self.df[:len(terms)], dtype=np.int32)
+        docs = np.fromiter(self.doc_hashes, dtype=np.uint64, count=len(self.doc_hashes))
+        meta = {'n_docs': self.n_docs, 'n_terms': len(terms)}
+        self._replace("df.npy", lambda f: np.save(f, df), binary=True)
+        self._replace("docs.npy", lambda f: np.save(f, docs), binary=True)
+        self._replace("vocab.txt", lambda f: f.write('\n'.join(terms)))
+        self._replace("meta.json", lambda f: json.dump(meta, f))
+
+    def _replace(self, name, write, binary=False):
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb' if binary else 'w', **({} if binary else {'encoding': 'utf-8'})) as tmp_file:
+                write(tmp_file)
+            os.replace(tmp_path, os.path.join(self.path, name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    """The process-wide topic index, loaded from TOPIC_INDEX_DIR on first use and saved at exit"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            try:
+                _index = TopicIndex(TOPIC_INDEX_DIR)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Starting a new topic index, could not load {TOPIC_INDEX_DIR}: {e}")
+                _index = TopicIndex()
+                _index.path = TOPIC_INDEX_DIR
+            atexit.register(_index.save)
+        return _index
+
+def save_index():
+    """Save the process-wide index if it was used
+    
+    Worker processes of a ProcessPoolExecutor exit without running atexit
+    handlers, so they must call this themselves.
+    """
+    with _index_lock:
+        index = _index
+    if index is not None:
+        index.save()
+
+def extract(text, company_name, stop=None, index=None):
+    """Key topics of a text or AnalysisDocument: the company first, then up to four others
+    
+    With an index, the document is ingested and words are ranked by TF-IDF
+    against the corpus; without one they are ranked by raw frequency.
+    """
+    doc = AnalysisDocument.of(text)
+    stop = stop if stop is not None else stop_words()
+    
+    # Count non-stopword words and capitalized entities
+    word_counts = Counter([word for word in doc.topic_words if word.lower() not in stop])
+    entity_counts = Counter(doc.entities)
+    
+    # Rank repeated words by frequency, weighted by rarity across the corpus
+    if index is not None:
+        index.ingest(doc.text, [word.lower() for word in word_counts])
+        repeated = [(word, count) for word, count in word_counts.items() if count > 1]
+        weights = index.idfs([word.lower() for word, _ in repeated])
+        scored = [(count * weight, word) for (word, count), weight in zip(repeated, weights)]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        topics = [word for _, word in scored[:10]]
+    else:
+        topics = [word for word, count in word_counts.most_common(10) if count > 1]
+    
+    # Combine frequent words and entities
+    topics.extend([entity for entity, count in entity_counts.most_common(5) if count > 1])
+    
+    # Drop duplicates and the company itself, which always leads
+    company_lower = company_name.lower()
+    unique_topics = []
+    for topic in topics:
+        if topic not in unique_topics and topic.lower() != company_lower:
+            unique_topics.append(topic)
+    
+    return [company_name] + unique_topics[:4]
+
+def extract_batch(texts, company_name, index=None):
+    """Topics for many texts or AnalysisDocuments in one call"""
+    stop = stop_words()
+    return [extract(text, company_name, stop, index) for text in texts]
+
+def benchmark(texts, company_name, repeat=1):
+    """Articles per second for batch topic extraction (texts are re-tokenized each round)"""
+    stop_words()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extract_batch([AnalysisDocument(text) for text in texts], company_name)
+    return len(texts) * repeat / (time.perf_counter() - start)
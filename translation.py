@@ -0,0 +1,379 @@
+import os
+import re
+import sys
+import mmap
+import time
+import struct
+import logging
+import argparse
+import tempfile
+import threading
+from functools import lru_cache
+
+import resources
+
+np = resources.LazyModule("numpy")
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_CACHE_SIZE = 4096                    # Translated strings memoized per glossary
+GLOSSARY_FILE = os.environ.get("NEWS_GLOSSARY")  # Extra glossary merged into the default one
+COMPILED_GLOSSARY = os.environ.get("NEWS_GLOSSARY_BIN")  # Compiled glossary (see Glossary.compile) used instead of both
+TOKEN_PATTERN = re.compile(r'\w+|\W+')           # Words and the runs between them; joins back to the text
+
+# English -> Hindi phrases; where phrases overlap the longest one starting at a word wins
+HINDI_GLOSSARY = {
+    "positive": "सकारात्मक",
+    "negative": "नकारात्मक",
+    "neutral": "तटस्थ",
+    "articles": "लेख",
+    "summary": "सारांश",
+    "analysis": "विश्लेषण",
+    "news": "समाचार",
+    "sentiment": "भावना",
+    "topics": "विषय",
+    "overall": "समग्र",
+    "company": "कंपनी",
+    "based on": "के आधार पर",
+    "main": "मुख्य",
+    "discussed": "चर्चा की गई",
+    "coverage": "कवरेज",
+    "highlights": "हाइलाइट्स",
+    "concerns about": "के बारे में चिंताएँ",
+    "includes": "शामिल है",
+    "predominantly": "मुख्य रूप से",
+    "mostly": "ज्यादातर",
+    "with": "के साथ",
+    "score": "स्कोर",
+    "and": "और",
+    "are": "हैं",
+    "is": "है",
+    "the": "",
+    "a": "एक",
+    "about": "के बारे में"
+}
+
+# Company names kept in English, with their usual capitalisation
+KEEP_AS_IS = ("Tesla", "Apple", "Google", "Microsoft", "Amazon", "Samsung", "Tata", "Reliance", "Infosys", "TCS")
+
+_END = ""  # Trie key holding a phrase's translation; never a token
+
+# Compiled glossary layout: header, key and value offset tables (n + 1 little-endian
+# uint32 each), then the UTF-8 key and value blobs. Keys are lowercased phrases
+# sorted by their bytes.
+COMPILED_MAGIC = b"NEWSGLS1"
+COMPILED_HEADER = struct.Struct("<8sII")  # magic, entry count, longest phrase in tokens
+
+class BaseGlossary:
+    """Single-pass phrase translation shared by the glossary stores
+
+    Translation scans the text once, replacing the longest phrase that starts
+    at each word. Matching works on whole words like \\b...\\b regexes and
+    ignores case; separators inside a phrase must match exactly. Subclasses
+    provide longest_match().
+    """
+
+    def __init__(self):
+        self.translate = lru_cache(maxsize=TRANSLATION_CACHE_SIZE)(self._translate)
+
+    def longest_match(self, tokens, start):
+        """(end, translation) of the longest phrase starting at tokens[start], or None"""
+        raise NotImplementedError
+
+    def _translate(self, text):
+        tokens = TOKEN_PATTERN.findall(text)
+        lowered = [token.lower() for token in tokens]
+        output = []
+        i = 0
+        while i < len(tokens):
+            match = self.longest_match(lowered, i)
+            if match is None:
+                output.append(tokens[i])
+                i += 1
+            else:
+                output.append(match[1])
+                i = match[0]
+        return ''.join(output)
+
+    def translate_batch(self, texts):
+        """Translate many texts in one call; repeated texts are translated once"""
+        translated = {}
+        return [translated[text] if text in translated else translated.setdefault(text, self.translate(text)) for text in texts]
+
+class Glossary(BaseGlossary):
+    """Phrase glossary stored as a trie over lowercased word and separator tokens
+
+    Lookup cost depends on phrase length, not on the number of entries.
+    """
+
+    def __init__(self, entries=None, keep=()):
+        super().__init__()
+        self._root = {}
+        self.size = 0
+        for phrase, translation in (entries or {}).items():
+            self.add(phrase, translation)
+        for name in keep:
+            self.add(name, name)
+
+    def add(self, phrase, translation):
+        """Add or replace one phrase"""
+        tokens = [token.lower() for token in TOKEN_PATTERN.findall(phrase.strip())]
+        if not tokens or not re.match(r'\w', tokens[0]) or not re.match(r'\w', tokens[-1]):
+            raise ValueError(f"Glossary phrase must start and end with a word character: {phrase!r}")
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if _END not in node:
+            self.size += 1
+        node[_END] = translation
+        self.translate.cache_clear()
+
+    def load(self, path):
+        """Merge a glossary file into this one
+
+        One entry per line: the English phrase, a tab, then its translation
+        (empty to drop the phrase). A line without a tab keeps the phrase
+        as written, e.g. a company name. Blank lines and # comments are skipped.
+        """
+        count = 0
+        with open(path, 'r', encoding='utf-8') as glossary_file:
+            for line_number, line in enumerate(glossary_file, 1):
+                line = line.rstrip('\r\n')
+                if not line.strip() or line.lstrip().startswith('#'):
+                    continue
+                phrase, tab, translation = line.partition('\t')
+                try:
+                    self.add(phrase, translation.strip() if tab else phrase.strip())
+                    count += 1
+                except ValueError as e:
+                    logger.warning(f"Skipping {path}:{line_number}: {e}")
+        logger.info(f"Loaded {count} glossary entries from {path}")
+        return self
+
+    def longest_match(self, tokens, start):
+        node = self._root
+        match = None
+        for i in range(start, len(tokens)):
+            node = node.get(tokens[i])
+            if node is None:
+                break
+            if _END in node:
+                match = (i + 1, node[_END])
+        return match
+
+    def items(self):
+        """(lowercased phrase, translation) pairs"""
+        stack = [("", self._root)]
+        while stack:
+            prefix, node = stack.pop()
+            for token, child in node.items():
+                if token == _END:
+                    yield prefix, child
+                else:
+                    stack.append((prefix + token, child))
+
+    def compile(self, path):
+        """Write the glossary in the compiled on-disk format read by CompiledGlossary"""
+        entries = sorted((phrase.encode('utf-8'), translation.encode('utf-8')) for phrase, translation in self.items())
+        longest = max((len(TOKEN_PATTERN.findall(phrase.decode('utf-8'))) for phrase, _ in entries), default=0)
+        key_offsets = np.zeros(len(entries) + 1, dtype='<u4')
+        value_offsets = np.zeros(len(entries) + 1, dtype='<u4')
+        key_offsets[1:] = np.cumsum([len(phrase) for phrase, _ in entries], dtype=np.uint64)
+        value_offsets[1:] = np.cumsum([len(translation) for _, translation in entries], dtype=np.uint64)
+        
+        directory = os.path.dirname(path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as compiled_file:
+                compiled_file.write(COMPILED_HEADER.pack(COMPILED_MAGIC, len(entries), longest))
+                compiled_file.write(key_offsets.tobytes())
+                compiled_file.write(value_offsets.tobytes())
+                compiled_file.write(b"".join(phrase for phrase, _ in entries))
+                compiled_file.write(b"".join(translation for _, translation in entries))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+class CompiledGlossary(BaseGlossary):
+    """Read-only glossary memory-mapped from a file written by Glossary.compile
+
+    Opening maps the file and wraps the offset tables without copying, so it
+    takes milliseconds whatever the size. A lookup narrows the sorted key
+    range token by token with binary searches, like walking a trie.
+    """
+
+    MAX_CACHED_RANGES = 100000
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        with open(path, 'rb') as compiled_file:
+            self._mmap = mmap.mmap(compiled_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, self.longest = COMPILED_HEADER.unpack_from(self._mmap, 0)
+        if magic != COMPILED_MAGIC:
+            raise ValueError(f"{path} is not a compiled glossary")
+        table_size = self.size + 1
+        self._key_offsets = np.frombuffer(self._mmap, dtype='<u4', count=table_size, offset=COMPILED_HEADER.size)
+        self._value_offsets = np.frombuffer(self._mmap, dtype='<u4', count=table_size, offset=COMPILED_HEADER.size + 4 * table_size)
+        self._keys_start = COMPILED_HEADER.size + 8 * table_size
+        self._values_start = self._keys_start + int(self._key_offsets[-1])
+        self._ranges = {}  # first token -> key index range, for the words seen so far
+        self._lock = threading.Lock()
+
+    def _key(self, index, length):
+        start = self._keys_start + int(self._key_offsets[index])
+        end = min(self._keys_start + int(self._key_offsets[index + 1]), start + length)
+        return self._mmap[start:end]
+
+    def _narrow(self, prefix, lo, hi):
+        """Index range of the keys in [lo, hi) that start with prefix"""
+        length = len(prefix)
+        low, high = lo, hi
+        while low < high:
+            mid = (low + high) // 2
+            if self._key(mid, length) < prefix:
+                low = mid + 1
+            else:
+                high = mid
+        first = low
+        high = hi
+        while low < high:
+            mid = (low + high) // 2
+            if self._key(mid, length) <= prefix:
+                low = mid + 1
+            else:
+                high = mid
+        return first, low
+
+    def _value(self, index):
+        start = self._values_start + int(self._value_offsets[index])
+        end = self._values_start + int(self._value_offsets[index + 1])
+        return self._mmap[start:end].decode('utf-8')
+
+    def longest_match(self, tokens, start):
+        first = tokens[start]
+        key_range = self._ranges.get(first)
+        if key_range is None:
+            key_range = self._narrow(first.encode('utf-8'), 0, self.size)
+            with self._lock:
+                if len(self._ranges) >= self.MAX_CACHED_RANGES:
+                    self._ranges.clear()
+                self._ranges[first] = key_range
+        lo, hi = key_range
+        if lo == hi:
+            return None
+        
+        match = None
+        prefix = b""
+        for i in range(start, min(len(tokens), start + self.longest)):
+            prefix += tokens[i].encode('utf-8')
+            if i > start:
+                lo, hi = self._narrow(prefix, lo, hi)
+                if lo == hi:
+                    break
+            # The exact phrase, if present, sorts first among the keys it prefixes
+            if int(self._key_offsets[lo + 1] - self._key_offsets[lo]) == len(prefix):
+                match = (i + 1, self._value(lo))
+        return match
+
+    def close(self):
+        self._key_offsets = self._value_offsets = None
+        self._mmap.close()
+
+_glossary = None
+_glossary_lock = threading.Lock()
+
+def default_glossary():
+    """The built-in entries plus GLOSSARY_FILE if set"""
+    glossary = Glossary(HINDI_GLOSSARY, keep=KEEP_AS_IS)
+    if GLOSSARY_FILE:
+        glossary.load(GLOSSARY_FILE)
+    return glossary
+
+def get_glossary():
+    """The process-wide Hindi glossary: COMPILED_GLOSSARY if set, else default_glossary()"""
+    global _glossary
+    with _glossary_lock:
+        if _glossary is None:
+            _glossary = CompiledGlossary(COMPILED_GLOSSARY) if COMPILED_GLOSSARY else default_glossary()
+        return _glossary
+
+def load_glossary(path):
+    """Merge a glossary file into the process-wide glossary"""
+    glossary = get_glossary()
+    if isinstance(glossary, CompiledGlossary):
+        raise ValueError(f"Compiled glossary {glossary.path} is read-only; recompile it with the new entries")
+    return glossary.load(path)
+
+def translate(text):
+    """Translate English text to Hindi with the process-wide glossary"""
+    return get_glossary().translate(text)
+
+def translate_batch(texts):
+    """Translate many texts (e.g. every article summary and the overall summary) in one call"""
+    return get_glossary().translate_batch(texts)
+
+def _regex_translate(text, entries, keep):
+    """The original per-call approach: one re.sub per entry, then one per company name"""
+    for english, hindi in entries.items():
+        text = re.sub(r'\b' + english + r'\b', hindi, text, flags=re.IGNORECASE)
+    for company in keep:
+        if company.lower() in text.lower():
+            text = re.compile(re.escape(company), re.IGNORECASE).sub(company, text)
+    return text
+
+def benchmark(texts, glossary=None, compiled=None, repeat=3):
+    """Strings per second, uncached, for the regex baseline (built-in entries only), the trie and the compiled glossary"""
+    glossary = glossary or default_glossary()
+    engines = {
+        'regex': lambda text: _regex_translate(text, HINDI_GLOSSARY, KEEP_AS_IS),
+        'trie': glossary._translate,
+    }
+    if compiled is not None:
+        engines['compiled'] = compiled._translate
+    results = {}
+    for name, translate_text in engines.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for text in texts:
+                translate_text(text)
+        results[name] = len(texts) * repeat / (time.perf_counter() - start)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile and benchmark translation glossaries")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compile_parser = commands.add_parser("compile", help="Compile the built-in entries plus glossary files into the on-disk format")
+    compile_parser.add_argument("glossaries", nargs="*", help="Tab-separated glossary files to merge in")
+    compile_parser.add_argument("-o", "--output", required=True)
+    benchmark_parser = commands.add_parser("benchmark", help="Compare the regex baseline, the trie and a compiled glossary")
+    benchmark_parser.add_argument("texts", help="File with one text per line")
+    benchmark_parser.add_argument("--compiled", help="Compiled glossary to benchmark and time the loading of")
+    benchmark_parser.add_argument("-n", "--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        glossary = default_glossary()
+        for path in args.glossaries:
+            glossary.load(path)
+        glossary.compile(args.output)
+        print(f"Compiled {glossary.size} entries into {args.output} ({os.path.getsize(args.output)} bytes)")
+        return 0
+
+    with open(args.texts, 'r', encoding='utf-8') as texts_file:
+        texts = [line.rstrip('\n') for line in texts_file if line.strip()]
+    compiled = None
+    if args.compiled:
+        start = time.perf_counter()
+        compiled = CompiledGlossary(args.compiled)
+        print(f"Opened {args.compiled} ({compiled.size} entries) in {(time.perf_counter() - start) * 1000:.2f} ms")
+    for name, rate in benchmark(texts, compiled=compiled, repeat=args.repeat).items():
+        print(f"{name:<10} {rate:10.0f} strings/s")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,329 @@
+import io
+import os
+import time
+import bisect
+import hashlib
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+
+from utils import create_cache_dir
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Text-to-speech settings
+TTS_LANG = 'hi'
+TTS_WORKERS = 2                      # Background synthesis threads
+MAX_REGISTERED_TEXTS = 10000         # Texts remembered for on-demand synthesis, least recently used dropped first
+AUDIO_CACHE_DIR = os.path.join("cache", "audio")
+AUDIO_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Upper bounds (seconds) of the synthesis latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+class TTSBackend:
+    """Interface for speech engines: turn text into audio bytes"""
+
+    name = "base"
+    mime = "audio/mp3"
+    extension = "mp3"
+
+    def synthesize(self, text, lang):
+        raise NotImplementedError
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS (needs network)"""
+
+    name = "gtts"
+
+    def synthesize(self, text, lang):
+        from gtts import gTTS
+        tts = gTTS(text=text, lang=lang, slow=False)
+        audio_io = io.BytesIO()
+        tts.write_to_fp(audio_io)
+        audio_io.seek(0)
+        return audio_io.read()
+
+class Pyttsx3Backend(TTSBackend):
+    """Offline local engine through pyttsx3 (espeak / SAPI / NSSpeech)"""
+
+    name = "pyttsx3"
+    mime = "audio/wav"
+    extension = "wav"
+
+    def __init__(self):
+        import pyttsx3
+        self._pyttsx3 = pyttsx3
+        self._lock = threading.Lock()  # pyttsx3 engines are not thread-safe
+
+    def synthesize(self, text, lang):
+        fd, path = tempfile.mkstemp(suffix="." + self.extension)
+        os.close(fd)
+        try:
+            with self._lock:
+                engine = self._pyttsx3.init()
+                for voice in engine.getProperty('voices'):
+                    if any(lang in str(code) for code in (voice.languages or [])) or lang in voice.id:
+                        engine.setProperty('voice', voice.id)
+                        break
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+            with open(path, 'rb') as audio_file:
+                return audio_file.read()
+        finally:
+            os.remove(path)
+
+class StubBackend(TTSBackend):
+    """Deterministic fake audio without any engine, for tests and offline runs"""
+
+    name = "stub"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def synthesize(self, text, lang):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return b"STUB-" + lang.encode('utf-8') + b"-" + hashlib.sha256(text.encode('utf-8')).digest()
+
+class AudioStore:
+    """Content-addressed on-disk audio cache, evicting least recently used clips past max_bytes
+    
+    File mtimes record recency. Every put rescans the directory, so the size
+    cap counts clips written by other processes (e.g. batch workers) too.
+    """
+
+    def __init__(self, cache_dir=AUDIO_CACHE_DIR, max_bytes=AUDIO_CACHE_MAX_BYTES):
+        self.cache_dir = create_cache_dir(cache_dir)
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".audio")
+
+    def _scan(self):
+        """path -> [last access time, size] of every stored clip, whichever process wrote it"""
+        index = {}
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".audio"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    index[entry.path] = [stat.st_mtime, stat.st_size]
+        return index
+
+    def get(self, key):
+        """Return the stored audio bytes for a key, or None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as audio_file:
+                audio = audio_file.read()
+        except FileNotFoundError:
+            return None
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except FileNotFoundError:
+            pass
+        return audio
+
+    def put(self, key, audio):
+        """Store audio bytes atomically and evict old clips over the size cap"""
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Error caching audio {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        index = self._scan()
+        total = sum(size for _, size in index.values())
+        victims = []
+        for victim in sorted(index, key=lambda p: index[p][0]):
+            if total <= self.max_bytes:
+                break
+            if victim == path:
+                continue
+            total -= index[victim][1]
+            victims.append(victim)
+        for victim in victims:
+            try:
+                os.remove(victim)
+            except FileNotFoundError:
+                pass
+
+class AudioStats:
+    """Audio cache hit ratio and synthesis latency histogram"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+        self.latency_counts = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+
+    def record_lookup(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self.latency_sum += seconds
+
+    def snapshot(self):
+        """Counters plus a cumulative latency histogram keyed by bucket upper bound"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            cumulative, buckets = 0, {}
+            for bound, count in zip(LATENCY_BUCKETS, self.latency_counts):
+                cumulative += count
+                buckets[bound] = cumulative
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'synthesis_latency': {
+                    'buckets': buckets,
+                    'count': cumulative,
+                    'sum': self.latency_sum,
+                },
+            }
+
+stats = AudioStats()
+
+_lock = threading.Lock()
+_texts = OrderedDict()  # key -> (text, lang, backend) registered for later synthesis, in LRU order
+_inflight = {}    # key -> Future of a running synthesis
+_executor = None
+_backend = None
+_store = None
+
+def get_backend():
+    """The active speech backend (gTTS unless another one was set)"""
+    global _backend
+    with _lock:
+        if _backend is None:
+            _backend = GTTSBackend()
+        return _backend
+
+def set_backend(backend):
+    """Switch the speech backend, e.g. to a StubBackend in tests or Pyttsx3Backend offline"""
+    global _backend
+    with _lock:
+        _backend = backend
+
+def get_store():
+    """The process-wide audio store"""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = AudioStore()
+        return _store
+
+def set_store(store):
+    """Replace the process-wide audio store"""
+    global _store
+    with _lock:
+        _store = store
+
+def audio_key(text, lang=TTS_LANG, backend=None):
+    """Content hash identifying the audio for (text, language, backend)"""
+    backend_name = (backend or get_backend()).name
+    return hashlib.sha256(f"{backend_name}\0{lang}\0{text}".encode('utf-8')).hexdigest()
+
+def _synthesize(key, text, lang, backend):
+    start = time.perf_counter()
+    try:
+        with metrics.span("tts"):
+            audio = backend.synthesize(text, lang)
+    except Exception as e:
+        logger.error(f"Error generating speech with {backend.name}: {e}")
+        metrics.incr("tts_errors")
+        audio = None
+    stats.record_latency(time.perf_counter() - start)
+    if audio is not None:
+        get_store().put(key, audio)
+    with _lock:
+        _inflight.pop(key, None)
+    return audio
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix="tts")
+    return _executor
+
+def register(text, lang=TTS_LANG):
+    """Record a text for synthesis on demand and return its audio key
+    
+    Nothing is synthesized until the audio is requested.
+    """
+    backend = get_backend()
+    key = audio_key(text, lang, backend)
+    with _lock:
+        _texts[key] = (text, lang, backend)
+        _texts.move_to_end(key)
+        while len(_texts) > MAX_REGISTERED_TEXTS:
+            _texts.popitem(last=False)
+    return key
+
+def prefetch(key):
+    """Start producing the audio for a key in the background
+    
+    Returns a future resolving to the audio bytes (or None). Stored clips
+    are served from the audio store; concurrent requests for the same key
+    share one synthesis.
+    """
+    audio = get_store().get(key)
+    stats.record_lookup(audio is not None)
+    if audio is not None:
+        future = Future()
+        future.set_result(audio)
+        return future
+    with _lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future
+        if key not in _texts:
+            raise KeyError(f"No text registered for audio key {key}")
+        text, lang, backend = _texts[key]
+        _texts.move_to_end(key)
+        future = _get_executor().submit(_synthesize, key, text, lang, backend)
+        _inflight[key] = future
+        return future
+
+def get_audio(key, timeout=None):
+    """Return the audio bytes for a key, synthesizing them if needed, or None on failure"""
+    try:
+        return prefetch(key).result(timeout=timeout)
+    except KeyError as e:
+        logger.warning(e.args[0])
+        return None
+    except FutureTimeoutError:
+        logger.warning(f"Audio {key} not ready within {timeout}s")
+        return None
+
+def synthesize(text, lang=TTS_LANG):
+    """Synthesize a text now, reusing audio already stored for the same text"""
+    return get_audio(register(text, lang))
+
+def audio_stats():
+    """Audio cache hit ratio and synthesis latency histogram"""
+    return stats.snapshot()
@@ -1,13 +1,15 @@
 import os
 import json
-import requests
+import tempfile
+import contextlib
 from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
 # Function to create a cache directory if not exists
-def create_cache_dir():
-    cache_dir = "cache"
+def create_cache_dir(cache_dir="cache"):
     if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
+        os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
 
 # Clean text function
 def clean_text(text):
@@ -30,3 +32,72 @@ def get_cached_data(cache_file):
         with open(cache_file, 'r') as file:
             return json.load(file)
     return None
+
+# Hold an exclusive lock on a lock file, shared between processes
+@contextlib.contextmanager
+def file_lock(path):
+    with open(path, 'a+b') as lock_file:
+        if os.name == 'nt':
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+# Write cached data atomically so concurrent readers never see a partial file
+def save_cached_data(data, cache_file):
+    cache_dir = os.path.dirname(cache_file) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as tmp_file:
+            json.dump(data, tmp_file)
+        os.replace(tmp_path, cache_file)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "ref_src", "cmpid"}
+TRACKING_PREFIXES = ("utm_",)
+
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+# Resolve a search result link to the article it points at: unwrap Google
+# /url?q= redirects and drop tracking parameters, leaving the rest untouched
+def resolve_link(url):
+    url = url.strip()
+    parts = urlsplit(url)
+    if parts.path == "/url" and (not parts.netloc or "google." in parts.netloc.lower()):
+        params = dict(parse_qsl(parts.query))
+        target = params.get("q") or params.get("url")
+        if target and target.startswith(("http://", "https://")):
+            return resolve_link(target)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    kept = [(name, value) for name, value in query if not is_tracking_param(name)]
+    if len(kept) == len(query):
+        return url
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(kept), parts.fragment))
+
+# Normalize a URL so equivalent links map to the same cache key
+def normalize_url(url):
+    parts = urlsplit(resolve_link(url))
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))